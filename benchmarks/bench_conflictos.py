@@ -0,0 +1,81 @@
+"""
+Benchmark de detección de cruces: comparación por pares vs. índice por recurso.
+
+Uso:
+    python benchmarks/bench_conflictos.py [--clases 500 2000 8000] [--repeticiones 3]
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from conflictos import RECURSOS, detectar_conflictos
+from horario import DIAS
+
+
+def conflictos_por_pares(df):
+    """Revisión ingenua: cada par de clases con el mismo recurso, día y horas superpuestas."""
+    filas = list(zip(df['clase_id'], df['dia'], df['minuto_inicio'], df['minuto_fin'],
+                     *(df[columna] for columna in RECURSOS.values())))
+    cruces = 0
+    for i, fila_a in enumerate(filas):
+        for fila_b in filas[i + 1:]:
+            if fila_a[1] != fila_b[1] or fila_a[2] >= fila_b[3] or fila_b[2] >= fila_a[3]:
+                continue
+            cruces += sum(a == b for a, b in zip(fila_a[4:], fila_b[4:]))
+    return cruces
+
+
+def generar_clases(num_clases, semilla=0):
+    """Clases de 1.5 a 4.5 h con docentes, aulas y grupos proporcionales al tamaño."""
+    rng = random.Random(semilla)
+    num_profesores = max(1, num_clases // 6)
+    num_aulas = max(1, num_clases // 10)
+    num_grupos = max(1, num_clases // 5)
+    filas = []
+    for clase_id in range(num_clases):
+        inicio = rng.randrange(8 * 60, 19 * 60, 45)
+        filas.append({
+            'clase_id': clase_id,
+            'ciclo': rng.randint(1, 10),
+            'dia': rng.choice(DIAS),
+            'minuto_inicio': inicio,
+            'minuto_fin': inicio + 45 * rng.randint(2, 6),
+            'profesor_nombre': f"Docente {rng.randrange(num_profesores)}",
+            'aula_nombre': f"AULA-{rng.randrange(num_aulas):02d}",
+            'grupo_nombre': f"Grupo {rng.randrange(num_grupos)}",
+        })
+    return pd.DataFrame(filas)
+
+
+def medir(funcion, df, repeticiones):
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion(df)
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor, resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--clases", type=int, nargs="+", default=[500, 2000, 5000])
+    parser.add_argument("--repeticiones", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'clases':>8} {'por pares (ms)':>16} {'índice (ms)':>13} {'cruces':>8}")
+    for num_clases in args.clases:
+        df = generar_clases(num_clases)
+        t_pares, cruces_pares = medir(conflictos_por_pares, df, args.repeticiones)
+        t_indice, registros = medir(detectar_conflictos, df, args.repeticiones)
+        print(f"{num_clases:>8} {t_pares * 1000:>16.1f} {t_indice * 1000:>13.1f} "
+              f"{cruces_pares:>4}/{len(registros):<4}")
+
+
+if __name__ == "__main__":
+    main()
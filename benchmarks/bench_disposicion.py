@@ -0,0 +1,122 @@
+"""
+Benchmark de las disposiciones de subcolumnas en días cada vez más grandes.
+
+Para cada tamaño mide el mejor tiempo de asignar_subcolumnas (optima) y de
+asignar_subcolumnas_agrupadas (agrupada), verifica que ninguna subcolumna tenga choques y
+que ambas usen exactamente el pico de cursos simultáneos, e informa cuán agrupadas quedan
+las secciones de cada asignatura. El tiempo se normaliza por n·log2(n): si crece más que
+--tolerancia entre el menor y el mayor tamaño, termina con código 1.
+
+Uso:
+    python benchmarks/bench_disposicion.py [--cursos 1000 4000 16000 64000 256000]
+                                           [--secciones 4] [--repeticiones 3]
+                                           [--tolerancia 1.0]
+"""
+import argparse
+import math
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from bench_subcolumnas import generar_dia_denso
+from horario import asignar_subcolumnas, asignar_subcolumnas_agrupadas
+
+DISPOSICIONES = {
+    'optima': lambda intervalos, grupos: asignar_subcolumnas(intervalos),
+    'agrupada': asignar_subcolumnas_agrupadas,
+}
+
+
+def pico_simultaneos(intervalos):
+    eventos = sorted([(primera, 1) for primera, _ in intervalos] +
+                     [(ultima, -1) for _, ultima in intervalos])
+    actual = pico = 0
+    for _, delta in eventos:
+        actual += delta
+        pico = max(pico, actual)
+    return pico
+
+
+def verificar(intervalos, subcolumnas, num_subcolumnas):
+    """Falla si dos cursos comparten franja en una subcolumna o si sobran subcolumnas."""
+    por_subcolumna = {}
+    for intervalo, subcolumna in zip(intervalos, subcolumnas):
+        por_subcolumna.setdefault(subcolumna, []).append(intervalo)
+    for subcolumna, lista in por_subcolumna.items():
+        lista.sort()
+        for (_, fin_anterior), (inicio, _) in zip(lista, lista[1:]):
+            if inicio < fin_anterior:
+                raise AssertionError(f"choque en la subcolumna {subcolumna}")
+    pico = pico_simultaneos(intervalos)
+    if num_subcolumnas != pico:
+        raise AssertionError(f"{num_subcolumnas} subcolumnas para un pico de {pico}")
+
+
+def agrupamiento(subcolumnas, grupos):
+    """
+    (subcolumnas distintas por asignatura, contigüidad media): la contigüidad de una
+    asignatura es subcolumnas distintas / ancho del rango que ocupan (1.0 = contiguas).
+    """
+    por_grupo = {}
+    for subcolumna, grupo in zip(subcolumnas, grupos):
+        por_grupo.setdefault(grupo, set()).add(subcolumna)
+    distintas = [len(columnas) for columnas in por_grupo.values()]
+    contiguidad = [len(columnas) / (max(columnas) - min(columnas) + 1)
+                   for columnas in por_grupo.values()]
+    return sum(distintas) / len(distintas), sum(contiguidad) / len(contiguidad)
+
+
+def medir(funcion, intervalos, grupos, repeticiones):
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion(intervalos, grupos)
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor, resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--cursos", type=int, nargs="+",
+                        default=[1000, 4000, 16000, 64000, 256000])
+    parser.add_argument("--secciones", type=int, default=4,
+                        help="secciones promedio por asignatura")
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--tolerancia", type=float, default=1.0,
+                        help="aumento relativo aceptado del tiempo por n·log2(n)")
+    args = parser.parse_args()
+
+    normalizados = {nombre: [] for nombre in DISPOSICIONES}
+    print(f"{'cursos':>8} {'disposición':<10} {'tiempo (ms)':>12} {'ns/(n·log n)':>13} "
+          f"{'subcols':>8} {'subcols/asig':>13} {'contigüidad':>12}")
+    for num_cursos in args.cursos:
+        intervalos = generar_dia_denso(num_cursos)
+        rng = random.Random(num_cursos)
+        num_asignaturas = max(1, num_cursos // args.secciones)
+        grupos = [rng.randrange(num_asignaturas) for _ in intervalos]
+
+        for nombre, funcion in DISPOSICIONES.items():
+            segundos, (subcolumnas, num_subcolumnas) = medir(funcion, intervalos, grupos,
+                                                             args.repeticiones)
+            verificar(intervalos, subcolumnas, num_subcolumnas)
+            por_asignatura, contiguidad = agrupamiento(subcolumnas, grupos)
+            normalizado = segundos * 1e9 / (num_cursos * math.log2(num_cursos))
+            normalizados[nombre].append(normalizado)
+            print(f"{num_cursos:>8} {nombre:<10} {segundos * 1000:>12.2f} {normalizado:>13.1f} "
+                  f"{num_subcolumnas:>8} {por_asignatura:>13.2f} {contiguidad:>12.2f}")
+
+    fallas = []
+    for nombre, valores in normalizados.items():
+        razon = valores[-1] / valores[0]
+        if razon > 1 + args.tolerancia:
+            fallas.append(f"{nombre}: el tiempo por n·log2(n) creció x{razon:.2f}")
+    for falla in fallas:
+        print(f"❌ {falla}")
+    return 1 if fallas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+"""
+Benchmark del tiempo de importación de los módulos, medido con `python -X importtime`.
+
+Cada módulo se importa en un proceso nuevo; se informa el mejor tiempo acumulado de
+varias repeticiones y se verifica que no cargue backends que debería cargar a demanda.
+Termina con código 1 si algún módulo supera su límite o carga un backend prohibido,
+para poder usarlo en CI.
+
+Uso:
+    python benchmarks/bench_importacion.py [--repeticiones 5] [--limite exportar=400]
+                                           [--json importacion.json]
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+
+MODULOS = ["utils", "horario", "exportar", "emisores", "ingesta", "cli", "visualizacion"]
+
+# Paquetes que cada módulo no debe importar por sí solo
+PROHIBIDOS = {
+    "utils": ("pandas", "reportlab", "openpyxl", "tkinter"),
+    "horario": ("reportlab", "openpyxl", "tkinter"),
+    "exportar": ("reportlab", "openpyxl", "tkinter", "anyio"),
+    "emisores": ("reportlab", "openpyxl", "tkinter", "anyio"),
+    "ingesta": ("reportlab", "openpyxl", "tkinter"),
+    "cli": ("reportlab", "openpyxl", "tkinter", "anyio"),
+    "visualizacion": ("reportlab", "openpyxl", "anyio"),
+}
+
+# Python sin tkinter (o sin las bibliotecas Tcl/Tk): el módulo se omite, no es una falla
+SIN_TKINTER = re.compile(r"No module named '_?tkinter'|lib(tk|tcl)[\d.]*\.so")
+
+
+class SinTkinter(RuntimeError):
+    """El módulo no se pudo importar porque falta tkinter en este intérprete."""
+
+
+def medir_importacion(modulo):
+    """
+    Importa `modulo` en un intérprete nuevo con -X importtime.
+    Retorna: (microsegundos acumulados del módulo, paquetes de primer nivel cargados)
+    """
+    entorno = dict(os.environ, PYTHONPATH=str(SRC))
+    proceso = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+                             capture_output=True, text=True, env=entorno, cwd=SRC)
+    if proceso.returncode != 0:
+        error = SinTkinter if SIN_TKINTER.search(proceso.stderr) else RuntimeError
+        raise error(f"No se pudo importar {modulo}:\n{proceso.stderr.strip()[-500:]}")
+
+    acumulado, paquetes = None, set()
+    for linea in proceso.stderr.splitlines():
+        if not linea.startswith("import time:") or "|" not in linea:
+            continue
+        _, cumulativo, nombre = (parte.strip() for parte in linea[len("import time:"):].split("|"))
+        if not cumulativo.isdigit():
+            continue  # encabezado
+        paquetes.add(nombre.split(".")[0])
+        if nombre == modulo:
+            acumulado = int(cumulativo)
+    return acumulado, paquetes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--modulos", nargs="+", default=MODULOS)
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--limite", nargs="+", default=[], metavar="MODULO=MS",
+                        help="tiempo máximo de importación en milisegundos")
+    parser.add_argument("--json", help="guardar los resultados en este archivo")
+    args = parser.parse_args()
+    limites = {modulo: float(ms) for modulo, ms in (item.split("=") for item in args.limite)}
+
+    resultados, fallas = {}, []
+    print(f"{'módulo':<15} {'importación (ms)':>17}  backends cargados")
+    for modulo in args.modulos:
+        try:
+            mediciones = [medir_importacion(modulo) for _ in range(args.repeticiones)]
+        except SinTkinter as e:
+            print(f"{modulo:<15} {'-':>17}  omitido: {str(e).splitlines()[-1]}")
+            continue
+        except RuntimeError as e:
+            print(f"{modulo:<15} {'-':>17}  {str(e).splitlines()[-1]}")
+            fallas.append(f"{modulo} no se pudo importar")
+            continue
+        mejor = min(tiempo for tiempo, _ in mediciones) / 1000
+        paquetes = mediciones[0][1]
+        prohibidos = sorted(set(PROHIBIDOS.get(modulo, ())) & paquetes)
+        backends = sorted({"pandas", "reportlab", "openpyxl", "tkinter", "anyio"} & paquetes)
+        print(f"{modulo:<15} {mejor:>17.1f}  {', '.join(backends) or '-'}")
+
+        resultados[modulo] = {"ms": round(mejor, 2), "backends": backends}
+        if prohibidos:
+            fallas.append(f"{modulo} importa {', '.join(prohibidos)}")
+        if modulo in limites and mejor > limites[modulo]:
+            fallas.append(f"{modulo}: {mejor:.1f} ms > {limites[modulo]:.1f} ms")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(resultados, indent=2), encoding="utf-8")
+    for falla in fallas:
+        print(f"❌ {falla}")
+    return 1 if fallas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
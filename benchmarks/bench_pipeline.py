@@ -0,0 +1,227 @@
+"""
+Benchmark por etapas del pipeline completo sobre horarios sintéticos.
+
+Cada caso genera un CSV (generar_horarios.py) y mide por separado lectura, franjas,
+colisiones, construcción de horarios, cruces y exportación: el mejor tiempo de
+varias repeticiones y, en una corrida aparte con tracemalloc, el pico de memoria.
+Con --minutos-franja se repite cada caso sobre grillas de franjas más finas.
+
+Uso:
+    python benchmarks/bench_pipeline.py [--filas 1000 10000] [--ciclos 10] [--densidad 0.2 0.8]
+                                        [--duracion 2-4 4-8] [--minutos-franja 45 15]
+                                        [--repeticiones 3] [--sin-exportar]
+                                        [--json resultados.json] [--comparar anterior.json]
+"""
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+import exportar
+from cache_datos import cargar_csv
+from conflictos import detectar_conflictos
+from generar_horarios import generar_horarios
+from horario import (DIAS, calcular_ocupacion, crear_horario_ciclo, crear_horarios_todos,
+                     detectar_max_colisiones)
+from utils import GrillaFranjas, franjas_ocupadas
+
+
+def _franjas_por_fila(contexto):
+    df, franjas = contexto['df'], contexto['franjas']
+    for hora_inicio, hora_fin in zip(df['hora_inicio'], df['hora_fin']):
+        franjas_ocupadas(hora_inicio, hora_fin, franjas)
+
+
+def _max_colisiones(contexto):
+    df, franjas = contexto['df'], contexto['franjas']
+    ocupacion = calcular_ocupacion(df, franjas)
+    for ciclo in contexto['ciclos']:
+        for dia in DIAS:
+            detectar_max_colisiones(df, ciclo, dia, ocupacion, franjas)
+
+
+def _horarios_por_ciclo(contexto):
+    for ciclo in contexto['ciclos']:
+        crear_horario_ciclo(contexto['df'], ciclo, contexto['franjas'])
+
+
+def _horarios_todos(contexto):
+    contexto['horarios'] = crear_horarios_todos(contexto['df'], contexto['ciclos'],
+                                                franjas=contexto['franjas'])
+
+
+# (nombre, función, es_exportación); cada etapa recibe el contexto del caso
+ETAPAS = [
+    ("leer_csv", lambda c: pd.read_csv(c['csv']), False),
+    ("cargar_csv_cache", lambda c: cargar_csv(c['csv'], c['dir_cache']), False),
+    ("franjas_ocupadas", _franjas_por_fila, False),
+    ("detectar_max_colisiones", _max_colisiones, False),
+    ("crear_horario_ciclo", _horarios_por_ciclo, False),
+    ("crear_horarios_todos", _horarios_todos, False),
+    ("detectar_conflictos", lambda c: detectar_conflictos(c['df']), False),
+    # Sin la caché de exportación: cada repetición vuelve a generar los archivos
+    ("exportar_todos_pdf",
+     lambda c: exportar.exportar_todos_pdf(*c['horarios'], cache=False), True),
+    ("exportar_todos_excel",
+     lambda c: exportar.exportar_todos_excel(*c['horarios'], cache=False), True),
+]
+
+
+def medir_etapa(funcion, contexto, repeticiones):
+    """Retorna (mejor tiempo en segundos, pico de memoria en MB)."""
+    mejor = float("inf")
+    # Los mensajes de los exportadores no se muestran durante la medición
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            funcion(contexto)
+            mejor = min(mejor, time.perf_counter() - inicio)
+
+        tracemalloc.start()
+        try:
+            funcion(contexto)
+            _, pico = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return mejor, pico / 2**20
+
+
+def ejecutar_caso(parametros, repeticiones, con_exportacion, tmp_dir):
+    parametros = dict(parametros)
+    franjas = GrillaFranjas(duracion=parametros.pop("minutos_franja"))
+    df = generar_horarios(**parametros)
+    nombre = "_".join(f"{clave}{valor}" for clave, valor in parametros.items()).replace(" ", "")
+    nombre += f"_franja{franjas.duracion}"
+    csv = Path(tmp_dir) / f"{nombre}.csv"
+    df.to_csv(csv, index=False)
+
+    contexto = {
+        'csv': csv,
+        'dir_cache': Path(tmp_dir) / ".cache" / nombre,
+        'df': df,
+        'franjas': franjas,
+        'ciclos': sorted(df['ciclo'].unique().tolist()),
+    }
+    cargar_csv(csv, contexto['dir_cache'])  # la etapa mide la lectura con la caché ya creada
+    exportar.OUTPUT_DIR = Path(tmp_dir) / "output"
+
+    etapas = {}
+    for nombre_etapa, funcion, es_exportacion in ETAPAS:
+        if es_exportacion and not con_exportacion:
+            continue
+        try:
+            segundos, pico_mb = medir_etapa(funcion, contexto, repeticiones)
+        except Exception as e:
+            # Se registra y el caso sigue; main termina con código de salida 1
+            etapas[nombre_etapa] = {"error": f"{type(e).__name__}: {str(e)[:200]}"}
+            continue
+        etapas[nombre_etapa] = {"segundos": round(segundos, 6), "pico_mb": round(pico_mb, 3)}
+    return etapas
+
+
+def _commit_actual():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, cwd=Path(__file__).parent, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _clave_caso(parametros):
+    return json.dumps(parametros, sort_keys=True)
+
+
+def comparar(casos, ruta_anterior, tolerancia):
+    """Imprime la razón nuevo/anterior por etapa. Retorna cuántas etapas empeoraron."""
+    anterior = json.loads(Path(ruta_anterior).read_text(encoding="utf-8"))
+    # Las corridas anteriores a --minutos-franja usaban siempre franjas de 45 minutos
+    previos = {_clave_caso({"minutos_franja": 45, **caso["parametros"]}): caso["etapas"]
+               for caso in anterior["casos"]}
+    print(f"\nComparación con {ruta_anterior} (commit {anterior.get('commit')})")
+    regresiones = 0
+    for caso in casos:
+        etapas_previas = previos.get(_clave_caso(caso["parametros"]))
+        if etapas_previas is None:
+            continue
+        for etapa, medida in caso["etapas"].items():
+            if not medida.get("segundos") or not etapas_previas.get(etapa, {}).get("segundos"):
+                continue
+            razon = medida["segundos"] / etapas_previas[etapa]["segundos"]
+            marca = "⚠️" if razon > 1 + tolerancia else "  "
+            regresiones += razon > 1 + tolerancia
+            print(f"{marca} {caso['parametros']['filas']:>7} filas "
+                  f"{caso['parametros']['minutos_franja']:>3} min {etapa:<25} x{razon:.2f}")
+    return regresiones
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--filas", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--ciclos", type=int, nargs="+", default=[10])
+    parser.add_argument("--densidad", type=float, nargs="+", default=[0.5])
+    parser.add_argument("--duracion", nargs="+", default=["2-6"],
+                        help="franjas por clase como MIN-MAX")
+    parser.add_argument("--minutos-franja", type=int, nargs="+", default=[45],
+                        help="duración de las franjas de la grilla (las clases siguen "
+                             "alineadas a 45 minutos)")
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--sin-exportar", action="store_true",
+                        help="omitir las etapas de exportación a PDF y Excel")
+    parser.add_argument("--json", help="guardar los resultados en este archivo")
+    parser.add_argument("--comparar", help="JSON de una corrida anterior")
+    parser.add_argument("--tolerancia", type=float, default=0.2,
+                        help="aumento relativo de tiempo aceptado al comparar")
+    args = parser.parse_args()
+
+    duraciones = [tuple(int(x) for x in rango.split("-")) for rango in args.duracion]
+    casos = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for filas, ciclos, densidad, duracion, minutos_franja in itertools.product(
+                args.filas, args.ciclos, args.densidad, duraciones, args.minutos_franja):
+            parametros = {"filas": filas, "ciclos": ciclos, "densidad": densidad,
+                          "duracion": list(duracion), "minutos_franja": minutos_franja}
+            print(f"\n▶ {parametros}")
+            etapas = ejecutar_caso({**parametros, "duracion": duracion}, args.repeticiones,
+                                   not args.sin_exportar, tmp_dir)
+            print(f"  {'etapa':<25} {'tiempo (ms)':>12} {'pico (MB)':>10}")
+            for etapa, medida in etapas.items():
+                if "error" in medida:
+                    print(f"  {etapa:<25} ❌ {medida['error'].splitlines()[0][:70]}")
+                else:
+                    print(f"  {etapa:<25} {medida['segundos'] * 1000:>12.2f} "
+                          f"{medida['pico_mb']:>10.2f}")
+            casos.append({"parametros": parametros, "etapas": etapas})
+
+    resultado = {
+        "commit": _commit_actual(),
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "repeticiones": args.repeticiones,
+        "casos": casos,
+    }
+    if args.json:
+        Path(args.json).write_text(json.dumps(resultado, indent=2), encoding="utf-8")
+        print(f"\n✓ Resultados en {args.json}")
+    fallidas = sum("error" in medida for caso in casos for medida in caso["etapas"].values())
+    if fallidas:
+        print(f"\n❌ {fallidas} etapa(s) fallaron")
+    regresiones = comparar(casos, args.comparar, args.tolerancia) if args.comparar else 0
+    return 1 if fallidas or regresiones else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+"""
+Benchmark del asignador de subcolumnas: montículos vs. primer ajuste anterior.
+
+Uso:
+    python benchmarks/bench_subcolumnas.py [--cursos 200 500 2000] [--repeticiones 5]
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from horario import asignar_subcolumnas
+from utils import FRANJAS
+
+
+def asignar_primer_ajuste(intervalos):
+    """Asignador anterior de crear_horario_ciclo: sondeo lineal por subcolumna y franja."""
+    tabla = {idx: [] for idx in range(len(FRANJAS))}
+    # El asignador anterior recibía el pico de colisiones ya calculado
+    ocupacion = [0] * len(FRANJAS)
+    for primera, ultima in intervalos:
+        for idx in range(primera, ultima):
+            ocupacion[idx] += 1
+    max_subcols = max(ocupacion)
+
+    subcolumnas = []
+    for primera, ultima in intervalos:
+        asignada = None
+        for idx_sub in range(max_subcols):
+            libre = True
+            for idx in range(primera, ultima):
+                while len(tabla[idx]) <= idx_sub:
+                    tabla[idx].append(None)
+                if tabla[idx][idx_sub] is not None:
+                    libre = False
+                    break
+            if libre:
+                asignada = idx_sub
+                break
+        if asignada is None:
+            asignada = max(len(tabla[idx]) for idx in range(primera, ultima))
+        for idx in range(primera, ultima):
+            while len(tabla[idx]) <= asignada:
+                tabla[idx].append(None)
+            tabla[idx][asignada] = True
+        subcolumnas.append(asignada)
+    return subcolumnas, max(len(fila) for fila in tabla.values())
+
+
+def generar_dia_denso(num_cursos, semilla=0):
+    """Intervalos [primera, ultima) de 2 a 6 franjas repartidos en todo el día."""
+    rng = random.Random(semilla)
+    intervalos = []
+    for _ in range(num_cursos):
+        duracion = rng.randint(2, 6)
+        primera = rng.randint(0, len(FRANJAS) - duracion)
+        intervalos.append((primera, primera + duracion))
+    # Orden por hora de inicio, como lo recibía el asignador anterior
+    intervalos.sort()
+    return intervalos
+
+
+def medir(funcion, intervalos, repeticiones):
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        _, num_subcols = funcion(intervalos)
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor, num_subcols
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--cursos", type=int, nargs="+", default=[50, 200, 1000, 3000])
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'cursos':>8} {'primer ajuste (ms)':>20} {'montículos (ms)':>17} {'subcols':>9}")
+    for num_cursos in args.cursos:
+        intervalos = generar_dia_denso(num_cursos)
+        t_anterior, cols_anterior = medir(asignar_primer_ajuste, intervalos, args.repeticiones)
+        t_nuevo, cols_nuevo = medir(asignar_subcolumnas, intervalos, args.repeticiones)
+        print(f"{num_cursos:>8} {t_anterior * 1000:>20.2f} {t_nuevo * 1000:>17.2f} "
+              f"{cols_anterior:>4}/{cols_nuevo:<4}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Generador de horario_final.csv sintéticos para benchmarks.
+
+Uso:
+    python benchmarks/generar_horarios.py salida.csv [--filas 5000] [--ciclos 10]
+                                          [--densidad 0.5] [--duracion 2 6] [--semilla 0]
+"""
+import argparse
+import random
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from horario import DIAS
+from utils import FRANJAS
+
+COLUMNAS = ['clase_id', 'asignatura_nombre', 'ciclo', 'grupo_nombre', 'dia',
+            'hora_inicio', 'hora_fin', 'aula_nombre', 'profesor_nombre']
+
+
+def _hora(minutos):
+    # Mismo formato que el CSV real: sin cero a la izquierda en la hora ("8:00")
+    return f"{minutos // 60}:{minutos % 60:02d}"
+
+
+def generar_horarios(filas=1000, ciclos=10, densidad=0.5, duracion=(2, 6), semilla=0):
+    """
+    DataFrame con el formato de horario_final.csv.
+
+    - filas: número de clases, repartidas entre `ciclos` ciclos y los 5 días
+    - densidad: 0 reparte los inicios en toda la jornada; cerca de 1 los concentra
+      en una ventana corta al comienzo, con muchos cursos simultáneos
+    - duracion: (mínimo, máximo) de franjas de 45 minutos por clase
+    """
+    rng = random.Random(semilla)
+    dur_min, dur_max = duracion
+    dur_max = min(dur_max, len(FRANJAS))
+    ultima_franja_inicio = len(FRANJAS) - dur_max
+    ventana = max(1, round((ultima_franja_inicio + 1) * (1 - densidad)))
+
+    # Recursos proporcionales al tamaño, como en una facultad real
+    asignaturas_por_ciclo = max(1, filas // (ciclos * 4))
+    num_profesores = max(1, filas // 8)
+    num_aulas = max(1, filas // 15)
+
+    registros = []
+    for clase_id in range(1, filas + 1):
+        ciclo = rng.randint(1, ciclos)
+        idx_asignatura = rng.randrange(asignaturas_por_ciclo)
+        franjas = rng.randint(dur_min, dur_max)
+        primera = rng.randrange(ventana)
+        inicio = FRANJAS.inicios[primera]
+        registros.append((
+            clase_id,
+            f"ASIGNATURA {ciclo}-{idx_asignatura:03d}",
+            ciclo,
+            f"Ciclo {ciclo} Sección {chr(ord('A') + rng.randrange(4))}",
+            rng.choice(DIAS),
+            _hora(inicio),
+            _hora(inicio + 45 * franjas),
+            f"AULA-{rng.randrange(num_aulas):03d}",
+            f"Docente {rng.randrange(num_profesores):04d}",
+        ))
+    return pd.DataFrame(registros, columns=COLUMNAS)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("salida")
+    parser.add_argument("--filas", type=int, default=1000)
+    parser.add_argument("--ciclos", type=int, default=10)
+    parser.add_argument("--densidad", type=float, default=0.5)
+    parser.add_argument("--duracion", type=int, nargs=2, default=[2, 6], metavar=("MIN", "MAX"))
+    parser.add_argument("--semilla", type=int, default=0)
+    args = parser.parse_args()
+
+    df = generar_horarios(args.filas, args.ciclos, args.densidad, tuple(args.duracion),
+                          args.semilla)
+    df.to_csv(args.salida, index=False)
+    print(f"✓ {len(df)} clases escritas en {args.salida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Caché columnar del CSV de horarios: una columna NumPy por archivo, abierta con memory-map
+"""
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from instrumentacion import contar, etapa, medido
+from utils import MINUTO_INVALIDO, minutos_columna
+
+# Subir la versión invalida las cachés escritas con un formato anterior
+VERSION_CACHE = 1
+MANIFIESTO = "manifiesto.json"
+
+
+def huella_archivo(ruta, tam_bloque=1 << 20):
+    """SHA-256 del archivo, leído por bloques."""
+    sha = hashlib.sha256()
+    with open(ruta, "rb") as f:
+        for bloque in iter(lambda: f.read(tam_bloque), b""):
+            sha.update(bloque)
+    return sha.hexdigest()
+
+
+def directorio_cache(ruta_csv):
+    ruta_csv = Path(ruta_csv)
+    return ruta_csv.parent / ".cache" / ruta_csv.stem
+
+
+def _leer_manifiesto(dir_cache):
+    try:
+        manifiesto = json.loads((dir_cache / MANIFIESTO).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if manifiesto.get("version") != VERSION_CACHE:
+        return None
+    return manifiesto
+
+
+def _escribir_cache(df, dir_cache, estado, sha256):
+    """
+    Normaliza y guarda el DataFrame: columnas enteras tal cual, el resto como
+    categóricas (códigos int32 + categorías en el manifiesto) y las horas también
+    como minutos enteros; una hora inválida queda como MINUTO_INVALIDO y la fila se
+    descarta después (normalizar_bloque, preparar_clases). Se escribe en un directorio
+    temporal y se reemplaza al final.
+    """
+    df = df.copy()
+    if 'dia' in df:
+        df['dia'] = df['dia'].astype(str).str.strip().str.upper()
+    df['minuto_inicio'] = minutos_columna(df['hora_inicio'], MINUTO_INVALIDO).astype(np.int16)
+    df['minuto_fin'] = minutos_columna(df['hora_fin'], MINUTO_INVALIDO).astype(np.int16)
+
+    tmp_dir = dir_cache.with_name(dir_cache.name + ".tmp")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+
+    columnas = []
+    for idx, nombre in enumerate(df.columns):
+        serie = df[nombre]
+        archivo = f"col_{idx}.npy"
+        if pd.api.types.is_integer_dtype(serie.dtype):
+            np.save(tmp_dir / archivo, serie.to_numpy())
+            columnas.append({"nombre": nombre, "archivo": archivo, "tipo": "entero"})
+        else:
+            categorica = pd.Categorical(serie.astype(object))
+            np.save(tmp_dir / archivo, categorica.codes.astype(np.int32))
+            columnas.append({"nombre": nombre, "archivo": archivo, "tipo": "categoria",
+                             "categorias": [str(c) for c in categorica.categories]})
+
+    manifiesto = {
+        "version": VERSION_CACHE,
+        "tamano": estado.st_size,
+        "mtime_ns": estado.st_mtime_ns,
+        "sha256": sha256,
+        "filas": len(df),
+        "columnas": columnas,
+    }
+    (tmp_dir / MANIFIESTO).write_text(json.dumps(manifiesto, ensure_ascii=False), encoding="utf-8")
+
+    shutil.rmtree(dir_cache, ignore_errors=True)
+    os.replace(tmp_dir, dir_cache)
+    return manifiesto
+
+
+def _leer_cache(dir_cache, manifiesto):
+    """Arma el DataFrame a partir de las columnas abiertas con memory-map."""
+    datos = {}
+    for columna in manifiesto["columnas"]:
+        valores = np.load(dir_cache / columna["archivo"], mmap_mode="r")
+        if columna["tipo"] == "categoria":
+            datos[columna["nombre"]] = pd.Categorical.from_codes(
+                valores, categories=columna["categorias"])
+        else:
+            datos[columna["nombre"]] = valores
+    # copy=False: las columnas siguen siendo vistas del memory-map
+    return pd.DataFrame(datos, copy=False)
+
+
+@medido("cargar_csv")
+def cargar_csv(ruta_csv, dir_cache=None):
+    """
+    Lee el CSV de horarios usando la caché columnar si sigue al día.
+    La caché se identifica por tamaño, mtime y SHA-256 del CSV y se reconstruye sola
+    cuando el archivo cambia. Si solo cambió el mtime (mismo contenido) se reutiliza.
+
+    Retorna un DataFrame con las columnas del CSV (texto como categóricas, 'dia' ya
+    normalizado) más 'minuto_inicio' y 'minuto_fin'.
+    """
+    ruta_csv = Path(ruta_csv)
+    dir_cache = Path(dir_cache) if dir_cache else directorio_cache(ruta_csv)
+    estado = ruta_csv.stat()
+    manifiesto = _leer_manifiesto(dir_cache)
+
+    sha256 = None
+    if manifiesto is not None:
+        if (manifiesto["tamano"], manifiesto["mtime_ns"]) == (estado.st_size, estado.st_mtime_ns):
+            return _leer_cache(dir_cache, manifiesto)
+        sha256 = huella_archivo(ruta_csv)
+        if sha256 == manifiesto["sha256"]:
+            manifiesto["mtime_ns"] = estado.st_mtime_ns
+            (dir_cache / MANIFIESTO).write_text(json.dumps(manifiesto, ensure_ascii=False),
+                                                encoding="utf-8")
+            return _leer_cache(dir_cache, manifiesto)
+
+    with etapa("leer_csv"):
+        df = pd.read_csv(ruta_csv)
+    contar("filas_leidas", len(df))
+    manifiesto = _escribir_cache(df, dir_cache, estado, sha256 or huella_archivo(ruta_csv))
+    return _leer_cache(dir_cache, manifiesto)
@@ -0,0 +1,214 @@
+"""
+Línea de comandos sin interfaz gráfica: carga → construcción → exportación
+
+Ejemplos:
+    python src/cli.py --ciclos 1 2 4 --formatos pdf --workers 4 --salida /srv/horarios
+    python src/cli.py --vista profesor_nombre --formatos excel
+    python src/cli.py --formatos json html --salida /srv/portal/horarios
+    python src/cli.py --minutos-franja 15 --jornada 07:00 21:00 --receso 13:00-14:00
+    python src/cli.py --validar
+    python src/cli.py --incremental --formatos pdf excel
+    python src/cli.py --perfil cprofile memoria --traza traza.json
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+import instrumentacion
+from cache_datos import cargar_csv
+from horario import COLUMNAS_VISTA, DISPOSICIONES, IndiceVistas
+from ingesta import normalizar_bloque
+from utils import FRANJAS, GrillaFranjas, minutos_a_hora
+
+# pdf: un PDF con todos los horarios; el resto, un archivo por horario
+FORMATOS = ("pdf", "excel", "json", "csv", "html")
+
+
+def crear_parser():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--entrada", default="data/horario_final.csv",
+                        help="CSV de horarios (por defecto: %(default)s)")
+    parser.add_argument("--ciclos", nargs="+", default=["todos"],
+                        help="ciclos a procesar, o 'todos' (por defecto)")
+    parser.add_argument("--vista", choices=COLUMNAS_VISTA, default="ciclo",
+                        help="un horario por ciclo (por defecto), docente, aula o grupo")
+    parser.add_argument("--disposicion", choices=DISPOSICIONES, default="optima",
+                        help="optima: mínimo de subcolumnas; agrupada: además junta las "
+                             "secciones de una misma asignatura")
+    parser.add_argument("--minutos-franja", type=int, default=FRANJAS.duracion,
+                        help="duración de cada franja en minutos (por defecto: %(default)s)")
+    parser.add_argument("--jornada", nargs=2, metavar=("INICIO", "FIN"),
+                        default=[minutos_a_hora(FRANJAS.inicio), minutos_a_hora(FRANJAS.fin)],
+                        help="inicio y fin de la jornada, HH:MM (por defecto: 08:00 22:15)")
+    parser.add_argument("--receso", action="append", default=[], metavar="INICIO-FIN",
+                        help="intervalo sin franjas, p. ej. 13:00-14:00 (se puede repetir)")
+    parser.add_argument("--formatos", nargs="+", choices=FORMATOS, default=["pdf", "excel"],
+                        help="formatos a generar (por defecto: pdf excel)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="procesos para exportar en paralelo (por defecto: 1)")
+    parser.add_argument("--salida", default="output", help="directorio de salida")
+    parser.add_argument("--streaming", action="store_true",
+                        help="Excel en modo write_only, con menos memoria")
+    parser.add_argument("--sin-cache", action="store_true",
+                        help="leer el CSV directamente, sin la caché columnar")
+    parser.add_argument("--regenerar", action="store_true",
+                        help="regenerar todos los archivos aunque no hayan cambiado")
+    parser.add_argument("--incremental", action="store_true",
+                        help="reconstruir solo los (ciclo, día) que cambiaron desde la "
+                             "última corrida (necesita clase_id; solo vista por ciclo)")
+    parser.add_argument("--validar", action="store_true",
+                        help="solo cargar, validar y construir; no exporta nada")
+    parser.add_argument("--interfaz", action="store_true",
+                        help="abrir la ventana de navegación en lugar de exportar")
+    parser.add_argument("--perfil", nargs="*", choices=("cprofile", "memoria"),
+                        help="medir tiempos y contadores por etapa; opcionalmente con "
+                             "cProfile y pico de memoria")
+    parser.add_argument("--traza", help="guardar la traza JSON de la instrumentación")
+    return parser
+
+
+def _ciclos_pedidos(valores):
+    if [valor.lower() for valor in valores] == ["todos"]:
+        return None
+    try:
+        return [int(valor) for valor in valores]
+    except ValueError:
+        raise SystemExit(f"❌ Ciclos inválidos: {' '.join(valores)} (use números o 'todos')")
+
+
+def _grilla_franjas(args):
+    try:
+        recesos = [receso.split("-") for receso in args.receso]
+        return GrillaFranjas(*args.jornada, args.minutos_franja, recesos)
+    except (ValueError, TypeError) as e:
+        raise SystemExit(f"❌ Grilla de franjas inválida: {e}")
+
+
+def cargar(ruta, ciclos=None, sin_cache=False):
+    """
+    Lee y valida el CSV. Retorna (df, descartadas) con las filas válidas de `ciclos`
+    y el conteo {motivo: filas} de las que se descartaron.
+    """
+    df = pd.read_csv(ruta) if sin_cache else cargar_csv(ruta)
+    descartadas = {}
+    df = normalizar_bloque(df, descartadas)
+    if ciclos is not None:
+        df = df[df['ciclo'].isin(ciclos)]
+    return df, descartadas
+
+
+def exportar_horarios(horarios, max_colisiones, franjas_activas, formatos, vista="ciclo",
+                      workers=1, streaming=False, cache=True):
+    """
+    Exporta a los formatos pedidos. Los backends se importan solo aquí.
+    Con cache=True los archivos que no cambiaron desde la última corrida no se regeneran.
+    """
+    import exportar
+
+    def progreso(hechos, total, clave):
+        print(f"   [{hechos}/{total}] {clave}")
+
+    archivos = []
+    if "excel" in formatos:
+        archivos += exportar.exportar_todos_excel(horarios, max_colisiones, franjas_activas,
+                                                  workers=workers, progreso=progreso,
+                                                  streaming=streaming, vista=vista,
+                                                  cache=cache)
+    if "pdf" in formatos:
+        archivos.append(exportar.exportar_todos_pdf(horarios, max_colisiones, franjas_activas,
+                                                    workers=workers, progreso=progreso,
+                                                    vista=vista, cache=cache))
+    for formato in formatos:
+        if formato not in ("pdf", "excel"):
+            archivos += exportar.exportar_todos(formato, horarios, max_colisiones,
+                                                franjas_activas, workers=workers,
+                                                progreso=progreso, vista=vista, cache=cache)
+    return archivos
+
+
+def main(argv=None):
+    args = crear_parser().parse_args(argv)
+    if args.perfil is not None or args.traza:
+        opciones = args.perfil or []
+        instrumentacion.activar(perfilar="cprofile" in opciones, memoria="memoria" in opciones)
+    try:
+        return ejecutar(args)
+    finally:
+        instrumentacion.informe(args.traza or os.environ.get("HORARIOS_TRAZA"))
+
+
+def ejecutar(args):
+    """Carga → construcción → exportación (o interfaz) según los argumentos."""
+    ciclos = _ciclos_pedidos(args.ciclos)
+    franjas = _grilla_franjas(args)
+    inicio = time.perf_counter()
+
+    try:
+        df, descartadas = cargar(args.entrada, ciclos, args.sin_cache)
+    except (OSError, KeyError, ValueError, pd.errors.ParserError) as e:
+        print(f"❌ No se pudo leer {args.entrada}: {type(e).__name__}: {e}")
+        return 2
+    print(f"✓ {len(df)} clases válidas leídas de {args.entrada}")
+    for motivo, filas in descartadas.items():
+        print(f"⚠️ {filas} fila(s) descartada(s): {motivo}")
+
+    if args.incremental and (args.vista != "ciclo" or args.disposicion != "optima"
+                             or "clase_id" not in df):
+        print("❌ --incremental necesita la columna clase_id, la vista por ciclo y la "
+              "disposición optima")
+        return 2
+
+    valores = ciclos if args.vista == "ciclo" and ciclos is not None else None
+    if valores is not None:
+        presentes = set(df['ciclo'].unique().tolist())
+        faltantes = [ciclo for ciclo in valores if ciclo not in presentes]
+        if faltantes:
+            print(f"⚠️ Ciclo(s) sin clases en {args.entrada}, se omiten: "
+                  f"{' '.join(map(str, faltantes))}")
+        valores = [ciclo for ciclo in valores if ciclo in presentes]
+        if not valores:
+            print("❌ Ninguno de los ciclos pedidos tiene clases")
+            return 2
+    if args.incremental:
+        import incremental
+        horarios, max_colisiones, franjas_activas, cambios = incremental.actualizar_horarios(
+            df, valores, Path(args.salida) / ".incremental", franjas)
+        print(f"✓ {sum(map(len, cambios.values()))} (ciclo, día) recalculados")
+    else:
+        indice = IndiceVistas(df, [args.vista], franjas)
+        horarios, max_colisiones, franjas_activas = indice.horarios(args.vista, valores,
+                                                                    args.disposicion)
+    print(f"✓ {len(horarios)} horarios construidos ({args.vista}) "
+          f"en {time.perf_counter() - inicio:.2f} s")
+
+    if args.validar:
+        return 1 if descartadas else 0
+
+    if args.interfaz:
+        from visualizacion import mostrar_horarios_navegables
+        mostrar_horarios_navegables(horarios, max_colisiones, franjas_activas)
+        return 0
+
+    import exportar
+    exportar.OUTPUT_DIR = Path(args.salida)
+    exportar.OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    try:
+        archivos = exportar_horarios(horarios, max_colisiones, franjas_activas, args.formatos,
+                                     args.vista, args.workers, args.streaming,
+                                     not args.regenerar)
+    except exportar.ExportacionError as e:
+        print(f"❌ {e}")
+        return 1
+
+    print(f"\n✅ {len(archivos)} archivo(s) en {exportar.OUTPUT_DIR} "
+          f"({time.perf_counter() - inicio:.2f} s en total)")
+    return 0
+
+
+# Protección necesaria para los procesos de exportación en paralelo
+if __name__ == "__main__":
+    sys.exit(main())
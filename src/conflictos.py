@@ -0,0 +1,126 @@
+"""
+Detección de cruces de docentes, aulas y grupos en todos los ciclos
+"""
+import heapq
+from bisect import bisect_left
+
+import numpy as np
+import pandas as pd
+
+from horario import DIAS, normalizar_dia, quitar_acentos
+from utils import hora_a_minutos, minutos_a_hora, minutos_columna
+
+RECURSOS = {
+    'profesor': 'profesor_nombre',
+    'aula': 'aula_nombre',
+    'grupo': 'grupo_nombre',
+}
+
+
+def _a_minutos(hora):
+    return hora_a_minutos(hora) if isinstance(hora, str) else int(hora)
+
+
+class IndiceRecursos:
+    """
+    Índice de clases por (recurso, dia) para cada tipo de recurso de RECURSOS.
+    Cada entrada guarda sus clases ordenadas por minuto de inicio junto con el máximo
+    acumulado de los minutos de fin, lo que permite responder esta_libre en O(log n).
+    """
+
+    def __init__(self, df, recursos=RECURSOS):
+        self.recursos = dict(recursos)
+        if 'minuto_inicio' in df:
+            inicios = df['minuto_inicio'].to_numpy(dtype=np.int64)
+            fines = df['minuto_fin'].to_numpy(dtype=np.int64)
+        else:
+            inicios = minutos_columna(df['hora_inicio']).astype(np.int64)
+            fines = minutos_columna(df['hora_fin']).astype(np.int64)
+        dias = normalizar_dia(df['dia']).astype(str)
+        dias = dias.map({dia: quitar_acentos(dia) for dia in dias.unique()}).to_numpy()
+        # inicios < 0: hora inválida en la caché columnar (MINUTO_INVALIDO)
+        validas = np.isin(dias, DIAS) & (inicios >= 0) & (inicios < fines)
+
+        base = pd.DataFrame({
+            'dia': dias,
+            'inicio': inicios,
+            'fin': fines,
+            'clase_id': df['clase_id'].to_numpy() if 'clase_id' in df else np.arange(len(df)),
+            'ciclo': df['ciclo'].to_numpy(),
+        })[validas]
+
+        self._entradas = {}
+        for tipo, columna in self.recursos.items():
+            nombres = pd.Series(df[columna].to_numpy()[validas], index=base.index).str.strip()
+            tabla = base.assign(recurso=nombres).dropna(subset=['recurso'])
+            tabla = tabla.sort_values(['recurso', 'dia', 'inicio', 'fin'], kind='stable')
+            columnas = {nombre: tabla[nombre].to_numpy()
+                        for nombre in ('inicio', 'fin', 'clase_id', 'ciclo')}
+            entradas = {}
+            for clave, filas in tabla.groupby(['recurso', 'dia'], sort=False).indices.items():
+                inicio, fin = filas[0], filas[-1] + 1  # las filas de un grupo son contiguas
+                entrada = {nombre: valores[inicio:fin] for nombre, valores in columnas.items()}
+                entrada['fin_maximo'] = np.maximum.accumulate(entrada['fin'])
+                entradas[clave] = entrada
+            self._entradas[tipo] = entradas
+
+    def esta_libre(self, tipo, recurso, dia, hora_inicio, hora_fin):
+        """
+        True si `recurso` (docente, aula o grupo según `tipo`) no tiene clases que se
+        crucen con [hora_inicio, hora_fin) ese día ("Miércoles" o "MIERCOLES"). Las horas
+        van como "HH:MM" o minutos.
+        """
+        entrada = self._entradas[tipo].get((recurso.strip(), quitar_acentos(dia.strip().upper())))
+        if entrada is None:
+            return True
+        inicio, fin = _a_minutos(hora_inicio), _a_minutos(hora_fin)
+        # Clases que empiezan antes del fin pedido: basta con que una termine después del inicio
+        antes = bisect_left(entrada['inicio'], fin)
+        return antes == 0 or entrada['fin_maximo'][antes - 1] <= inicio
+
+    def conflictos(self, tipos=None):
+        """
+        Todos los cruces de los tipos pedidos (por defecto todos), como registros:
+        {'tipo', 'recurso', 'dia', 'inicio', 'fin', 'clase_a', 'clase_b', 'ciclo_a', 'ciclo_b'}
+        donde inicio/fin son los minutos en que se superponen las dos clases.
+        Barrido por hora de inicio: O(n log n + cruces encontrados).
+        """
+        registros = []
+        for tipo in tipos or self.recursos:
+            for (recurso, dia), entrada in self._entradas[tipo].items():
+                # Sin superposiciones: cada clase empieza después de que terminan las anteriores
+                if (entrada['inicio'][1:] >= entrada['fin_maximo'][:-1]).all():
+                    continue
+                activas = []  # (fin, posición)
+                for pos, (inicio, fin) in enumerate(zip(entrada['inicio'].tolist(),
+                                                        entrada['fin'].tolist())):
+                    while activas and activas[0][0] <= inicio:
+                        heapq.heappop(activas)
+                    for fin_activa, pos_activa in activas:
+                        registros.append({
+                            'tipo': tipo,
+                            'recurso': recurso,
+                            'dia': dia,
+                            'inicio': inicio,
+                            'fin': min(fin, fin_activa),
+                            'clase_a': entrada['clase_id'][pos_activa].item(),
+                            'clase_b': entrada['clase_id'][pos].item(),
+                            'ciclo_a': entrada['ciclo'][pos_activa].item(),
+                            'ciclo_b': entrada['ciclo'][pos].item(),
+                        })
+                    heapq.heappush(activas, (fin, pos))
+        return registros
+
+
+def detectar_conflictos(df, tipos=None):
+    """Cruces de docentes, aulas y grupos de todo el DataFrame."""
+    return IndiceRecursos(df).conflictos(tipos)
+
+
+def conflictos_a_dataframe(registros):
+    """Tabla de cruces con las horas en "HH:MM", lista para revisar o exportar."""
+    tabla = pd.DataFrame(registros, columns=['tipo', 'recurso', 'dia', 'inicio', 'fin',
+                                             'clase_a', 'clase_b', 'ciclo_a', 'ciclo_b'])
+    for columna in ('inicio', 'fin'):
+        tabla[columna] = [minutos_a_hora(minutos) for minutos in tabla[columna]]
+    return tabla
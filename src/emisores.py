@@ -0,0 +1,156 @@
+"""
+Exportación a JSON, CSV y HTML para consumo automático (portales, scripts)
+
+Solo usan la biblioteca estándar y escriben cada horario en una sola pasada, a un archivo
+o a un flujo de texto ya abierto (sys.stdout, io.StringIO, una respuesta HTTP, ...).
+Tienen la firma de los exportadores de exportar.py y están registrados en
+exportar.EXPORTADORES como 'json', 'csv' y 'html'.
+"""
+import csv
+import json
+from contextlib import nullcontext
+from html import escape
+
+import exportar
+from exportar import VISTAS, bloques_dia
+from horario import DIAS
+from paleta import color_curso
+
+ESTILO_HTML = (
+    "table{border-collapse:collapse;font:11px sans-serif}"
+    "th,td{border:1px solid #999;padding:3px;text-align:center}"
+    "thead th{background:#2F5496;color:#fff}"
+    "tbody th{background:#D0CECE;white-space:nowrap}"
+)
+
+
+def _abrir(file_path, vista, ciclo, extension):
+    """
+    Retorna (contexto del flujo, ruta). Un flujo ya abierto se usa tal cual y no se cierra;
+    sin file_path se escribe en OUTPUT_DIR con el nombre de siempre.
+    """
+    if hasattr(file_path, "write"):
+        return nullcontext(file_path), None
+    file_path = file_path or exportar.OUTPUT_DIR / exportar._nombre_archivo(vista, ciclo, extension)
+    flujo = open(exportar._ruta_salida(file_path), "w", encoding="utf-8", newline="")
+    return flujo, str(file_path)
+
+
+def _terminar(ruta, flujo, formato):
+    if ruta is None:
+        return flujo
+    print(f"🧾 {formato} exportado: {ruta}")
+    return ruta
+
+
+def _titulo(vista, ciclo):
+    return f"{VISTAS[vista][0]} {ciclo} - Horario Académico"
+
+
+def horario_a_dict(df_horario, max_colisiones, franjas_activas, ciclo, vista='ciclo'):
+    """
+    Horario como bloques de curso por día, listo para json.dump:
+
+        {"vista", "valor", "titulo", "franjas": [...],
+         "dias": {dia: {"subcolumnas": n, "bloques": [{"curso", "subcolumna",
+                  "franja_inicio", "franja_fin", "hora_inicio", "hora_fin"}, ...]}}}
+
+    franja_inicio y franja_fin son índices de "franjas", ambos incluidos.
+    """
+    franjas = list(franjas_activas)
+    dias = {}
+    for dia in DIAS:
+        bloques = [
+            {
+                "curso": valor,
+                "subcolumna": idx_sub,
+                "franja_inicio": inicio,
+                "franja_fin": fin - 1,
+                "hora_inicio": franjas[inicio].split(" - ")[0],
+                "hora_fin": franjas[fin - 1].split(" - ")[1],
+            }
+            for idx_sub, inicio, fin, valor in bloques_dia(df_horario[dia], max_colisiones[dia],
+                                                           franjas)
+            if valor
+        ]
+        dias[dia] = {"subcolumnas": int(max_colisiones[dia]), "bloques": bloques}
+    return {
+        "vista": vista,
+        "valor": ciclo.item() if hasattr(ciclo, "item") else ciclo,
+        "titulo": _titulo(vista, ciclo),
+        "franjas": franjas,
+        "dias": dias,
+    }
+
+
+def exportar_json(df_horario, max_colisiones, franjas_activas, ciclo, file_path=None,
+                  vista='ciclo'):
+    """Exporta los bloques de curso de horario_a_dict a JSON."""
+    salida, ruta = _abrir(file_path, vista, ciclo, "json")
+    with salida as flujo:
+        json.dump(horario_a_dict(df_horario, max_colisiones, franjas_activas, ciclo, vista),
+                  flujo, ensure_ascii=False)
+    return _terminar(ruta, flujo, "JSON")
+
+
+def exportar_csv(df_horario, max_colisiones, franjas_activas, ciclo, file_path=None,
+                 vista='ciclo'):
+    """
+    Exporta la grilla a CSV como la hoja de Excel: una fila por franja y una columna por
+    subcolumna ("LUNES", o "LUNES 1", "LUNES 2", ... si el día tiene varias).
+    """
+    dias = [dia for dia in DIAS if max_colisiones[dia]]
+    encabezado = ["HORARIO"]
+    for dia in dias:
+        num_subcols = max_colisiones[dia]
+        encabezado += [dia] if num_subcols == 1 else [f"{dia} {idx + 1}"
+                                                      for idx in range(num_subcols)]
+
+    salida, ruta = _abrir(file_path, vista, ciclo, "csv")
+    with salida as flujo:
+        escritor = csv.writer(flujo)
+        escritor.writerow(encabezado)
+        for franja in franjas_activas:
+            fila = [franja]
+            for dia in dias:
+                cursos = df_horario[dia][franja]
+                num_subcols = max_colisiones[dia]
+                fila += cursos[:num_subcols] + [""] * (num_subcols - len(cursos))
+            escritor.writerow(fila)
+    return _terminar(ruta, flujo, "CSV")
+
+
+def exportar_html(df_horario, max_colisiones, franjas_activas, ciclo, file_path=None,
+                  vista='ciclo'):
+    """
+    Exporta una página HTML estática con la tabla del horario: los bloques de un mismo
+    curso se unen con rowspan y llevan el color de la asignatura, como en el PDF.
+    """
+    # Celdas de cada fila en orden de columna; las filas cubiertas por un rowspan no llevan
+    filas = [[] for _ in franjas_activas]
+    encabezado = ['<th>HORARIO</th>']
+    for dia in DIAS:
+        num_subcols = max_colisiones[dia]
+        if num_subcols == 0:
+            continue
+        encabezado.append(f'<th colspan="{num_subcols}">{dia}</th>' if num_subcols > 1
+                          else f'<th>{dia}</th>')
+        for _, inicio, fin, valor in bloques_dia(df_horario[dia], num_subcols, franjas_activas):
+            if not valor:
+                filas[inicio].append('<td></td>')
+                continue
+            rowspan = f' rowspan="{fin - inicio}"' if fin - inicio > 1 else ''
+            filas[inicio].append(f'<td{rowspan} style="background:#{color_curso(valor)}">'
+                                 f'{escape(valor)}</td>')
+
+    titulo = escape(_titulo(vista, ciclo))
+    salida, ruta = _abrir(file_path, vista, ciclo, "html")
+    with salida as flujo:
+        flujo.write(f'<!DOCTYPE html>\n<html lang="es">\n<head><meta charset="utf-8">'
+                    f'<title>{titulo}</title><style>{ESTILO_HTML}</style></head>\n<body>\n'
+                    f'<h1>{titulo}</h1>\n<table>\n<thead><tr>{"".join(encabezado)}</tr></thead>\n'
+                    f'<tbody>\n')
+        for franja, celdas in zip(franjas_activas, filas):
+            flujo.write(f'<tr><th>{escape(franja)}</th>{"".join(celdas)}</tr>\n')
+        flujo.write('</tbody>\n</table>\n</body>\n</html>\n')
+    return _terminar(ruta, flujo, "HTML")
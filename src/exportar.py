@@ -1,81 +1,219 @@
 """
 Módulo de exportación de horarios a PDF y Excel con subcolunas dinámicas
+
+reportlab y openpyxl se importan dentro de cada función, la primera vez que se exporta
+en ese formato: importar este módulo no los carga ni crea directorios.
+
+Las exportaciones por lotes usan una caché por contenido (CacheExportacion): un archivo
+cuya huella no cambió desde la última ejecución no se vuelve a generar.
+
+Cada formato es un exportador de un horario registrado en EXPORTADORES; PDF y Excel son
+dos de ellos y JSON, CSV y HTML están en emisores.py.
 """
 import hashlib
+import importlib
+import json
+import os
+import re
+import tempfile
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-from reportlab.lib.pagesizes import landscape, A4
-from reportlab.lib.units import cm
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, PageBreak, Spacer
-from reportlab.lib import colors
-from openpyxl import Workbook
-from openpyxl.styles import PatternFill, Font, Alignment, Border, Side
-from openpyxl.utils import get_column_letter
 from horario import DIAS
+# generar_color_pastel sigue disponible desde este módulo
+from paleta import color_curso, generar_color_pastel
+from instrumentacion import contar, etapa
+from utils import escala_franjas, franjas_contiguas
 
 OUTPUT_DIR = Path("output")
-OUTPUT_DIR.mkdir(exist_ok=True)
-
-def generar_color_pastel(texto):
-    hash_obj = hashlib.md5(texto.encode())
-    hash_hex = hash_obj.hexdigest()
-    r = min(220, max(140, int(int(hash_hex[0:2], 16) * 0.5 + 100)))
-    g = min(220, max(140, int(int(hash_hex[2:4], 16) * 0.5 + 100)))
-    b = min(220, max(140, int(int(hash_hex[4:6], 16) * 0.5 + 100)))
-    return f"{r:02x}{g:02x}{b:02x}"
-
-def exportar_a_pdf(df_horario, max_colisiones, franjas_activas, ciclo):
-    file_path = OUTPUT_DIR / f"Horario_Ciclo_{ciclo}.pdf"
-    doc = SimpleDocTemplate(str(file_path), pagesize=landscape(A4),
-                           rightMargin=0.3*cm, leftMargin=0.3*cm,
-                           topMargin=0.5*cm, bottomMargin=0.3*cm)
-    elements = []
-    styles = getSampleStyleSheet()
-    
-    title = Paragraph(f"CICLO {ciclo} - Horario Académico", 
-                     ParagraphStyle('CustomTitle', parent=styles['Heading1'],
-                                   fontSize=14, textColor=colors.HexColor('#2F5496'),
-                                   spaceAfter=4, alignment=1, fontName='Helvetica-Bold'))
-    elements.append(title)
-    elements.append(Spacer(1, 0.2*cm))
-    
-    datos_tabla = []
-    encabezado = ["HORARIO"]
+# Alto en puntos de una fila de Excel con franjas de 45 minutos; escala con la duración
+ALTO_FILA_EXCEL = 60
+
+# Subir la versión al cambiar el aspecto de los archivos: invalida toda la caché
+VERSION_EXPORTADOR = 1
+DIR_CACHE = ".cache_exportacion"
+
+# Etiquetas de cada vista (columna del horario): título del PDF y prefijo de hojas y archivos
+VISTAS = {
+    'ciclo': ("CICLO", "Ciclo"),
+    'profesor_nombre': ("DOCENTE", "Docente"),
+    'aula_nombre': ("AULA", "Aula"),
+    'grupo_nombre': ("GRUPO", "Grupo"),
+}
+
+def _nombre_archivo(vista, valor, extension):
+    """Horario_Ciclo_1.pdf, Horario_Docente_Ana_Ruiz.xlsx, ..."""
+    valor = re.sub(r"[^\w-]+", "_", str(valor)).strip("_")
+    return f"Horario_{VISTAS[vista][1]}_{valor}.{extension}"
+
+def _nombre_completo(vista, extension):
+    if vista == 'ciclo':
+        return f"Horarios_Completo.{extension}"
+    return f"Horarios_{VISTAS[vista][1]}_Completo.{extension}"
+
+def _ruta_salida(file_path):
+    """Crea el directorio del archivo al momento de escribirlo."""
+    Path(file_path).parent.mkdir(parents=True, exist_ok=True)
+    return str(file_path)
+
+def _alto_fila_excel(df_horario):
+    return max(15, round(ALTO_FILA_EXCEL * escala_franjas(df_horario)))
+
+def _titulo_hoja(vista, valor):
+    """Nombre de hoja de Excel: sin caracteres prohibidos y de 31 caracteres como máximo."""
+    return re.sub(r"[\[\]:*?/\\]", "-", f"{VISTAS[vista][1]} {valor}")[:31]
+
+def huella_exportacion(df_horario, max_colisiones, franjas_activas, ciclo, formato,
+                       vista='ciclo'):
+    """
+    SHA-256 de todo lo que determina un archivo exportado: celdas visibles, subcolumnas,
+    franjas, título (vista y ciclo), formato y VERSION_EXPORTADOR.
+    """
+    sha = hashlib.sha256()
+    sha.update(json.dumps([VERSION_EXPORTADOR, formato, vista, str(ciclo),
+                           [max_colisiones[dia] for dia in DIAS],
+                           list(franjas_activas)]).encode())
     for dia in DIAS:
+        horario_dia = df_horario[dia]
         num_subcols = max_colisiones[dia]
-        encabezado.append(dia)
-        for _ in range(1, num_subcols):
-            encabezado.append("")
-    datos_tabla.append(encabezado)
-    
-    cell_style = ParagraphStyle('CellStyle', parent=styles['Normal'],
-                               fontSize=6, alignment=1, wordWrap='CJK',
-                               fontName='Times-Roman', leading=7)
+        for franja in franjas_activas:
+            cursos = list(horario_dia[franja][:num_subcols])
+            cursos += [""] * (num_subcols - len(cursos))
+            sha.update("\x1f".join(cursos).encode())
+            sha.update(b"\x1e")
+    return sha.hexdigest()
+
+class CacheExportacion:
+    """
+    Manifiesto output/.cache_exportacion/manifiesto.json con la huella de cada archivo
+    generado. Guarda también su tamaño y fecha de modificación: un archivo reescrito o
+    borrado por fuera de la caché deja de considerarse vigente.
+    """
+
+    def __init__(self, directorio=None):
+        self.directorio = Path(directorio or OUTPUT_DIR)
+        self.dir_paginas = self.directorio / DIR_CACHE / "paginas"
+        self.ruta = self.directorio / DIR_CACHE / "manifiesto.json"
+        try:
+            self.archivos = json.loads(self.ruta.read_text(encoding="utf-8"))["archivos"]
+        except (OSError, ValueError, KeyError, TypeError):
+            self.archivos = {}
+
+    def _clave(self, archivo):
+        return Path(os.path.relpath(archivo, self.directorio)).as_posix()
+
+    def vigente(self, archivo, huella):
+        """True si `archivo` existe y es el que se generó con esta huella."""
+        entrada = self.archivos.get(self._clave(archivo))
+        if entrada is None or entrada["huella"] != huella:
+            return False
+        try:
+            estado = os.stat(archivo)
+        except OSError:
+            return False
+        return [estado.st_size, estado.st_mtime_ns] == [entrada["bytes"], entrada["mtime_ns"]]
+
+    def registrar(self, archivo, huella):
+        estado = os.stat(archivo)
+        self.archivos[self._clave(archivo)] = {
+            "huella": huella, "bytes": estado.st_size, "mtime_ns": estado.st_mtime_ns}
+
+    def podar_paginas(self, vigentes, vista):
+        """
+        Borra las páginas en caché de `vista` que no están en `vigentes`: ciclos (o
+        docentes, aulas, ...) que ya no forman parte del PDF completo.
+        """
+        vigentes = {Path(pagina).name for pagina in vigentes}
+        # Mismo patrón que _nombre_archivo(vista, valor, "pdf")
+        for pagina in self.dir_paginas.glob(f"Horario_{VISTAS[vista][1]}_*.pdf"):
+            if pagina.name not in vigentes:
+                pagina.unlink(missing_ok=True)
+                self.archivos.pop(self._clave(pagina), None)
+
+    def guardar(self):
+        self.ruta.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.ruta.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"archivos": self.archivos}, indent=1), encoding="utf-8")
+        tmp.replace(self.ruta)
+
+def bloques_dia(horario_dia, num_subcols, franjas):
+    """
+    Recorre un día subcolumna por subcolumna uniendo las franjas consecutivas del mismo curso.
+    Genera (idx_sub, inicio, fin, curso), con `fin` excluido e índices de `franjas`;
+    las celdas vacías salen de a una con curso "". Solo se unen franjas contiguas en el
+    tiempo: dos sesiones iguales separadas por franjas inactivas son bloques distintos.
+    """
+    columnas = [horario_dia[franja] for franja in franjas]
+    contiguas = franjas_contiguas(franjas)
+    for idx_sub in range(num_subcols):
+        valores = [cursos[idx_sub] if idx_sub < len(cursos) else "" for cursos in columnas]
+        inicio = 0
+        while inicio < len(valores):
+            valor = valores[inicio]
+            fin = inicio + 1
+            while (fin < len(valores) and valor and valores[fin] == valor
+                   and contiguas[fin - 1]):
+                fin += 1
+            yield idx_sub, inicio, fin, valor
+            inicio = fin
+
+class ExportacionError(Exception):
+    """Uno o más ciclos fallaron en una exportación por lotes; el resto sí se exportó."""
+
+    def __init__(self, errores, archivos):
+        self.errores = errores
+        self.archivos = archivos
+        detalle = "; ".join(f"ciclo {ciclo}: {error}" for ciclo, error in errores.items())
+        super().__init__(f"Falló la exportación de {len(errores)} ciclo(s): {detalle}")
+
+class ExportacionCancelada(Exception):
+    """La exportación se detuvo a pedido del usuario (lanzada desde `progreso`)."""
+
+def _ejecutar_por_ciclo(funcion, trabajos, workers=1, progreso=None):
+    """
+    Ejecuta funcion(*args) para cada (ciclo, args) de `trabajos`.
+    Con workers > 1 reparte los ciclos en un ProcessPoolExecutor; cada HorarioGrilla
+    viaja compactado, solo con sus propios cursos (HorarioGrilla.__reduce__).
+    Un error en un ciclo se registra y no detiene el resto del lote.
+    `progreso(hechos, total, ciclo)` se llama al terminar cada ciclo; si lanza una
+    excepción (p. ej. ExportacionCancelada) el lote se detiene y los ciclos pendientes
+    no se exportan.
     
-    for franja in franjas_activas:
-        fila = [Paragraph(franja, ParagraphStyle('FranjaStyle', parent=styles['Normal'],
-                                                fontSize=6, alignment=1,
-                                                fontName='Times-Bold', leading=6))]
-        for dia in DIAS:
-            cursos = df_horario[dia][franja]
-            num_subcols = max_colisiones[dia]
-            while len(cursos) < num_subcols:
-                cursos.append("")
-            for idx_sub in range(num_subcols):
-                valor = cursos[idx_sub] if idx_sub < len(cursos) else ""
-                fila.append(Paragraph(valor if valor else "", cell_style))
-        datos_tabla.append(fila)
+    Retorna: (resultados {ciclo: valor}, errores {ciclo: mensaje})
+    """
+    resultados, errores = {}, {}
+    total = len(trabajos)
     
-    page_width = landscape(A4)[0]
-    ancho_horario = 1.5*cm
-    ancho_total = page_width - 0.6*cm
-    total_subcols = sum(max_colisiones.values())
-    ancho_subcolumna = (ancho_total - ancho_horario) / total_subcols
-    col_widths = [ancho_horario] + [ancho_subcolumna] * total_subcols
+    def registrar(hechos, ciclo, obtener):
+        try:
+            resultados[ciclo] = obtener()
+        except Exception as e:
+            errores[ciclo] = f"{type(e).__name__}: {e}"
+            print(f"❌ Error exportando ciclo {ciclo}: {errores[ciclo]}")
+        if progreso:
+            progreso(hechos, total, ciclo)
     
-    tabla = Table(datos_tabla, colWidths=col_widths, repeatRows=1)
+    if workers <= 1:
+        for hechos, (ciclo, args) in enumerate(trabajos, 1):
+            registrar(hechos, ciclo, lambda: funcion(*args))
+        return resultados, errores
     
-    comandos = [
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futuros = {pool.submit(funcion, *args): ciclo for ciclo, args in trabajos}
+        try:
+            for hechos, futuro in enumerate(as_completed(futuros), 1):
+                registrar(hechos, futuros[futuro], futuro.result)
+        except BaseException:
+            for futuro in futuros:
+                futuro.cancel()
+            raise
+    return resultados, errores
+
+@lru_cache(maxsize=None)
+def _comandos_base_pdf():
+    """Comandos de estilo comunes a todas las tablas PDF."""
+    from reportlab.lib import colors
+    return (
         ('FONTNAME', (0, 0), (-1, -1), 'Times-Roman'),
         ('FONTSIZE', (0, 0), (-1, -1), 6),
         ('ALIGNMENT', (0, 0), (-1, -1), 'CENTER'),
@@ -92,137 +230,263 @@ def exportar_a_pdf(df_horario, max_colisiones, franjas_activas, ciclo):
         ('FONTNAME', (0, 1), (0, -1), 'Times-Bold'),
         ('FONTSIZE', (0, 1), (0, -1), 6),
         ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-    ]
+    )
+
+@lru_cache(maxsize=None)
+def _estilos_pdf():
+    """Estilos de párrafo del PDF, creados una sola vez por proceso."""
+    from reportlab.lib import colors
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    
+    styles = getSampleStyleSheet()
+    return {
+        'titulo': ParagraphStyle('CustomTitle', parent=styles['Heading1'],
+                                 fontSize=14, textColor=colors.HexColor('#2F5496'),
+                                 spaceAfter=4, alignment=1, fontName='Helvetica-Bold'),
+        'celda': ParagraphStyle('CellStyle', parent=styles['Normal'],
+                                fontSize=6, alignment=1, wordWrap='CJK',
+                                fontName='Times-Roman', leading=7),
+    }
+
+def _documento_pdf(file_path):
+    from reportlab.lib.pagesizes import landscape, A4
+    from reportlab.lib.units import cm
+    from reportlab.platypus import SimpleDocTemplate
+    return SimpleDocTemplate(_ruta_salida(file_path), pagesize=landscape(A4),
+                             rightMargin=0.3*cm, leftMargin=0.3*cm,
+                             topMargin=0.5*cm, bottomMargin=0.3*cm)
+
+def _cuerpo_pdf(df_horario, max_colisiones, franjas_activas, unir=True):
+    """
+    Filas de franjas y comandos de color de la tabla de un ciclo.
+    Con `unir` los bloques verticales de un mismo curso son una sola celda (SPAN) con un
+    único Paragraph; sin él el Paragraph se repite en cada franja, porque reportlab no
+    parte una tabla entre páginas por dentro de un SPAN.
+    """
+    from reportlab.lib import colors
+    from reportlab.platypus import Paragraph
+    
+    estilos = _estilos_pdf()
+    # La franja es texto plano: su estilo lo dan los comandos de la columna 0
+    filas = [[franja] for franja in franjas_activas]
+    comandos = []
+    num_parrafos = 0
+    
+    col_actual = 1
+    for dia in DIAS:
+        for idx_sub, inicio, fin, valor in bloques_dia(df_horario[dia], max_colisiones[dia],
+                                                       franjas_activas):
+            if not valor:
+                filas[inicio].append("")
+                continue
+            columna = col_actual + idx_sub
+            inicio_celda, fin_celda = (columna, inicio + 1), (columna, fin)
+            if unir:
+                filas[inicio].append(Paragraph(valor, estilos['celda']))
+                for idx_fila in range(inicio + 1, fin):
+                    filas[idx_fila].append("")
+                num_parrafos += 1
+                if fin - inicio > 1:
+                    comandos.append(('SPAN', inicio_celda, fin_celda))
+            else:
+                for idx_fila in range(inicio, fin):
+                    filas[idx_fila].append(Paragraph(valor, estilos['celda']))
+                num_parrafos += fin - inicio
+            comandos.append(('BACKGROUND', inicio_celda, fin_celda,
+                             colors.HexColor(f"#{color_curso(valor)}")))
+        col_actual += max_colisiones[dia]
+    
+    return filas, comandos, num_parrafos
+
+def _elementos_pdf_ciclo(df_horario, max_colisiones, franjas_activas, ciclo, vista='ciclo'):
+    """
+    Título y tabla de un ciclo (o de un docente, aula o grupo según `vista`) para doc.build.
+    Si la tabla cabe en una página, los bloques verticales de un mismo curso se unen en
+    una sola celda (SPAN); si no, se arma sin unir para que reportlab la parta por filas
+    repitiendo el encabezado.
+    """
+    from reportlab.lib.pagesizes import landscape, A4
+    from reportlab.lib.units import cm
+    from reportlab.platypus import Paragraph, Spacer, Table, TableStyle
+    
+    estilos = _estilos_pdf()
+    comandos_base = list(_comandos_base_pdf())
     
+    encabezado = ["HORARIO"]
     col_actual = 1
     for dia in DIAS:
         num_subcols = max_colisiones[dia]
+        if num_subcols == 0:
+            continue
+        encabezado.append(dia)
+        for _ in range(1, num_subcols):
+            encabezado.append("")
         if num_subcols > 1:
-            comandos.append(('SPAN', (col_actual, 0), (col_actual + num_subcols - 1, 0)))
+            comandos_base.append(('SPAN', (col_actual, 0), (col_actual + num_subcols - 1, 0)))
         col_actual += num_subcols
     
-    for i in range(1, len(datos_tabla)):
-        for j in range(1, len(datos_tabla[i])):
-            valor_obj = datos_tabla[i][j]
-            valor_text = valor_obj.text if hasattr(valor_obj, 'text') else str(valor_obj)
-            if valor_text and valor_text.strip():
-                asignatura = valor_text.split(' - ')[0].strip()
-                comandos.append(('BACKGROUND', (j, i), (j, i), 
-                               colors.HexColor(f"#{generar_color_pastel(asignatura)}")))
-    
-    tabla.setStyle(TableStyle(comandos))
-    elements.append(tabla)
-    doc.build(elements)
+    titulo = Paragraph(f"{VISTAS[vista][0]} {ciclo} - Horario Académico", estilos['titulo'])
+    total_subcols = sum(max_colisiones.values())
+    if total_subcols == 0:
+        return [titulo, Spacer(1, 0.2*cm), Paragraph("Sin clases registradas", estilos['celda'])]
+    
+    page_width, page_height = landscape(A4)
+    ancho_horario = 1.5*cm
+    ancho_total = page_width - 0.6*cm
+    ancho_subcolumna = (ancho_total - ancho_horario) / total_subcols
+    col_widths = [ancho_horario] + [ancho_subcolumna] * total_subcols
+    
+    # Alto útil tras el título: márgenes de _documento_pdf y 6pt de padding del marco
+    _, alto_titulo = titulo.wrap(ancho_total, page_height)
+    alto_disponible = (page_height - 0.8*cm - 12 - 0.2*cm - alto_titulo
+                       - titulo.getSpaceBefore() - titulo.getSpaceAfter())
+    
+    for unir in (True, False):
+        filas, comandos, num_parrafos = _cuerpo_pdf(df_horario, max_colisiones,
+                                                    franjas_activas, unir)
+        comandos = comandos_base + comandos
+        tabla = Table([encabezado] + filas, colWidths=col_widths, repeatRows=1)
+        tabla.setStyle(TableStyle(comandos))
+        if unir and tabla.wrap(ancho_total, alto_disponible)[1] > alto_disponible:
+            contar("pdf.tablas_partidas")
+            continue
+        break
+    contar("pdf.parrafos", num_parrafos)
+    contar("pdf.comandos_tablestyle", len(comandos))
+    
+    return [
+        titulo,
+        Spacer(1, 0.2*cm),
+        tabla,
+    ]
+
+def _escribir_pdf(df_horario, max_colisiones, franjas_activas, ciclo, file_path, vista):
+    """PDF de un ciclo, sin avisar: también genera las páginas del PDF completo."""
+    doc = _documento_pdf(file_path)
+    elementos = _elementos_pdf_ciclo(df_horario, max_colisiones, franjas_activas, ciclo, vista)
+    with etapa("pdf.build"):
+        doc.build(elementos)
+    return str(file_path)
+
+def exportar_a_pdf(df_horario, max_colisiones, franjas_activas, ciclo, file_path=None,
+                   vista='ciclo'):
+    file_path = file_path or OUTPUT_DIR / _nombre_archivo(vista, ciclo, "pdf")
+    _escribir_pdf(df_horario, max_colisiones, franjas_activas, ciclo, file_path, vista)
     print(f"📄 PDF exportado: {file_path}")
     return str(file_path)
 
-def exportar_todos_pdf(horarios_dict, max_colisiones_dict, franjas_activas_dict):
-    file_path = OUTPUT_DIR / "Horarios_Completo.pdf"
-    doc = SimpleDocTemplate(str(file_path), pagesize=landscape(A4),
-                           rightMargin=0.3*cm, leftMargin=0.3*cm,
-                           topMargin=0.5*cm, bottomMargin=0.3*cm)
-    elements = []
-    styles = getSampleStyleSheet()
-    ciclos = sorted(list(horarios_dict.keys()))
+def _exportar_todos_pdf_por_paginas(horarios_dict, max_colisiones_dict, franjas_activas_dict,
+                                    file_path, workers, progreso, vista='ciclo',
+                                    cache=None, huellas=None):
+    """
+    Genera un PDF por ciclo (en paralelo con workers > 1) y los une en orden de ciclo.
+    Con `cache` los PDF por ciclo se conservan en output/.cache_exportacion/paginas y solo
+    se regeneran los ciclos cuya huella cambió; el resto reutiliza sus páginas.
+    """
+    from pypdf import PdfWriter
     
-    for idx_ciclo, ciclo in enumerate(ciclos):
-        df_horario = horarios_dict[ciclo]
-        max_colisiones = max_colisiones_dict[ciclo]
-        franjas_activas = franjas_activas_dict[ciclo]
-        
-        title = Paragraph(f"CICLO {ciclo} - Horario Académico",
-                         ParagraphStyle('CustomTitle', parent=styles['Heading1'],
-                                       fontSize=14, textColor=colors.HexColor('#2F5496'),
-                                       spaceAfter=4, alignment=1, fontName='Helvetica-Bold'))
-        elements.append(title)
-        elements.append(Spacer(1, 0.2*cm))
-        
-        datos_tabla = []
-        encabezado = ["HORARIO"]
-        for dia in DIAS:
-            num_subcols = max_colisiones[dia]
-            encabezado.append(dia)
-            for _ in range(1, num_subcols):
-                encabezado.append("")
-        datos_tabla.append(encabezado)
-        
-        cell_style = ParagraphStyle('CellStyle', parent=styles['Normal'],
-                                   fontSize=6, alignment=1, wordWrap='CJK',
-                                   fontName='Times-Roman', leading=7)
-        
-        for franja in franjas_activas:
-            fila = [Paragraph(franja, ParagraphStyle('FranjaStyle', parent=styles['Normal'],
-                                                    fontSize=6, alignment=1,
-                                                    fontName='Times-Bold', leading=6))]
-            for dia in DIAS:
-                cursos = df_horario[dia][franja]
-                num_subcols = max_colisiones[dia]
-                while len(cursos) < num_subcols:
-                    cursos.append("")
-                for idx_sub in range(num_subcols):
-                    valor = cursos[idx_sub] if idx_sub < len(cursos) else ""
-                    fila.append(Paragraph(valor if valor else "", cell_style))
-            datos_tabla.append(fila)
-        
-        page_width = landscape(A4)[0]
-        ancho_horario = 1.5*cm
-        ancho_total = page_width - 0.6*cm
-        total_subcols = sum(max_colisiones.values())
-        ancho_subcolumna = (ancho_total - ancho_horario) / total_subcols
-        col_widths = [ancho_horario] + [ancho_subcolumna] * total_subcols
-        
-        tabla = Table(datos_tabla, colWidths=col_widths, repeatRows=1)
-        
-        comandos = [
-            ('FONTNAME', (0, 0), (-1, -1), 'Times-Roman'),
-            ('FONTSIZE', (0, 0), (-1, -1), 6),
-            ('ALIGNMENT', (0, 0), (-1, -1), 'CENTER'),
-            ('VALIGNMENT', (0, 0), (-1, -1), 'TOP'),
-            ('TOPPADDING', (0, 0), (-1, -1), 2),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 2),
-            ('LEFTPADDING', (0, 0), (-1, -1), 2),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 2),
-            ('FONTNAME', (0, 0), (-1, 0), 'Times-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 7),
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2F5496')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('BACKGROUND', (0, 1), (0, -1), colors.HexColor('#D0CECE')),
-            ('FONTNAME', (0, 1), (0, -1), 'Times-Bold'),
-            ('FONTSIZE', (0, 1), (0, -1), 6),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+    ciclos = sorted(list(horarios_dict.keys()))
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        dir_paginas = cache.dir_paginas if cache else Path(tmp_dir)
+        paginas = {ciclo: dir_paginas / _nombre_archivo(vista, ciclo, "pdf") for ciclo in ciclos}
+        trabajos = [
+            (ciclo, (horarios_dict[ciclo], max_colisiones_dict[ciclo],
+                     franjas_activas_dict[ciclo], ciclo, paginas[ciclo], vista))
+            for ciclo in ciclos
+            if not (cache and cache.vigente(paginas[ciclo], huellas[ciclo]))
         ]
+        # Las páginas no se anuncian una por una: solo el PDF completo
+        resultados, errores = _ejecutar_por_ciclo(_escribir_pdf, trabajos, workers, progreso)
+        if cache:
+            for ciclo in resultados:
+                cache.registrar(paginas[ciclo], huellas[ciclo])
+            cache.podar_paginas(paginas.values(), vista)
+            cache.guardar()
+            if len(trabajos) < len(ciclos):
+                print(f"♻️ {len(ciclos) - len(trabajos)} ciclo(s) sin cambios: "
+                      f"se reutilizan sus páginas")
         
-        col_actual = 1
-        for dia in DIAS:
-            num_subcols = max_colisiones[dia]
-            if num_subcols > 1:
-                comandos.append(('SPAN', (col_actual, 0), (col_actual + num_subcols - 1, 0)))
-            col_actual += num_subcols
-        
-        for i in range(1, len(datos_tabla)):
-            for j in range(1, len(datos_tabla[i])):
-                valor_obj = datos_tabla[i][j]
-                valor_text = valor_obj.text if hasattr(valor_obj, 'text') else str(valor_obj)
-                if valor_text and valor_text.strip():
-                    asignatura = valor_text.split(' - ')[0].strip()
-                    comandos.append(('BACKGROUND', (j, i), (j, i),
-                                   colors.HexColor(f"#{generar_color_pastel(asignatura)}")))
-        
-        tabla.setStyle(TableStyle(comandos))
-        elements.append(tabla)
+        # Unión determinista: siempre en orden de ciclo, no de finalización
+        writer = PdfWriter()
+        for ciclo in ciclos:
+            if ciclo not in errores:
+                writer.append(str(paginas[ciclo]))
+        writer.write(_ruta_salida(file_path))
+    
+    print(f"📚 PDF completo: {file_path}")
+    if errores:
+        raise ExportacionError(errores, [str(file_path)])
+    return str(file_path)
+
+def exportar_todos_pdf(horarios_dict, max_colisiones_dict, franjas_activas_dict,
+                       workers=1, progreso=None, vista='ciclo', cache=True):
+    """
+    Exporta todos los ciclos a un único PDF, una página (o más) por ciclo.
+    Con cache=True no se regenera si ningún ciclo cambió y, con pypdf instalado, solo se
+    vuelven a generar las páginas de los ciclos que cambiaron.
+    """
+    file_path = OUTPUT_DIR / _nombre_completo(vista, "pdf")
+    ciclos = sorted(list(horarios_dict.keys()))
+    
+    cache = CacheExportacion() if cache else None
+    huellas = None
+    if cache:
+        huellas = {ciclo: huella_exportacion(horarios_dict[ciclo], max_colisiones_dict[ciclo],
+                                             franjas_activas_dict[ciclo], ciclo, "pdf", vista)
+                   for ciclo in ciclos}
+        huella_total = hashlib.sha256("\n".join(huellas[ciclo] for ciclo in ciclos).encode())
+        huella_total = huella_total.hexdigest()
+        if cache.vigente(file_path, huella_total):
+            print(f"♻️ PDF completo sin cambios: {file_path}")
+            return str(file_path)
+    
+    if cache or workers > 1:
+        try:
+            import pypdf
+        except ImportError:
+            if workers > 1:
+                print("⚠️ pypdf no está instalado: el PDF completo se genera en un solo proceso")
+        else:
+            _exportar_todos_pdf_por_paginas(horarios_dict, max_colisiones_dict,
+                                            franjas_activas_dict, file_path, workers,
+                                            progreso, vista, cache, huellas)
+            if cache:
+                cache.registrar(file_path, huella_total)
+                cache.guardar()
+            return str(file_path)
+    
+    from reportlab.platypus import PageBreak
+    
+    doc = _documento_pdf(file_path)
+    elements = []
+    
+    for idx_ciclo, ciclo in enumerate(ciclos):
+        elements.extend(_elementos_pdf_ciclo(horarios_dict[ciclo], max_colisiones_dict[ciclo],
+                                             franjas_activas_dict[ciclo], ciclo, vista))
         if idx_ciclo < len(ciclos) - 1:
             elements.append(PageBreak())
+        if progreso:
+            progreso(idx_ciclo + 1, len(ciclos), ciclo)
     
-    doc.build(elements)
+    with etapa("pdf.build"):
+        doc.build(elements)
+    if cache:
+        cache.registrar(file_path, huella_total)
+        cache.guardar()
     print(f"📚 PDF completo: {file_path}")
     return str(file_path)
 
-def exportar_horario_excel(df_horario, max_colisiones, franjas_activas, ciclo):
+def exportar_horario_excel(df_horario, max_colisiones, franjas_activas, ciclo, file_path=None,
+                           vista='ciclo'):
     """Exporta un horario individual a Excel con formato profesional."""
-    file_path = OUTPUT_DIR / f"Horario_Ciclo_{ciclo}.xlsx"
+    from openpyxl import Workbook
+    from openpyxl.styles import PatternFill, Font, Alignment, Border, Side
+    from openpyxl.utils import get_column_letter
+    
+    file_path = file_path or OUTPUT_DIR / _nombre_archivo(vista, ciclo, "xlsx")
     wb = Workbook()
     ws = wb.active
-    ws.title = f"Ciclo {ciclo}"
+    ws.title = _titulo_hoja(vista, ciclo)
     
     # Estilos
     thin_border = Border(
@@ -250,6 +514,8 @@ def exportar_horario_excel(df_horario, max_colisiones, franjas_activas, ciclo):
     # Encabezados de días con merge
     for dia in DIAS:
         num_subcols = max_colisiones[dia]
+        if num_subcols == 0:
+            continue
         inicio_merge = col_actual
         fin_merge = col_actual + num_subcols - 1
         
@@ -274,8 +540,7 @@ def exportar_horario_excel(df_horario, max_colisiones, franjas_activas, ciclo):
     
     # Filas de datos
     fila_actual = 2
-    colores_asignaturas = {}
-    
+    alto_fila = _alto_fila_excel(df_horario)
     for franja in franjas_activas:
         # Columna de franja horaria
         cell = ws.cell(row=fila_actual, column=1, value=franja)
@@ -300,10 +565,7 @@ def exportar_horario_excel(df_horario, max_colisiones, franjas_activas, ciclo):
                 cell.border = thin_border
                 
                 if valor and valor.strip():
-                    asignatura = valor.split(' - ')[0].strip()
-                    if asignatura not in colores_asignaturas:
-                        colores_asignaturas[asignatura] = generar_color_pastel(asignatura)
-                    color = colores_asignaturas[asignatura]
+                    color = color_curso(valor)
                     cell.fill = PatternFill(start_color=color, end_color=color, fill_type='solid')
                     cell.font = Font(size=9)
                 else:
@@ -311,26 +573,217 @@ def exportar_horario_excel(df_horario, max_colisiones, franjas_activas, ciclo):
                 
                 col_actual += 1
         
-        ws.row_dimensions[fila_actual].height = 60
+        ws.row_dimensions[fila_actual].height = alto_fila
+        contar("excel.celdas", col_actual - 1)
         fila_actual += 1
     
-    wb.save(str(file_path))
+    with etapa("excel.save"):
+        wb.save(_ruta_salida(file_path))
     print(f"📊 Excel exportado: {file_path}")
     return str(file_path)
 
-def exportar_todos_excel(horarios_dict, max_colisiones_dict, franjas_activas_dict):
-    """Exporta todos los ciclos, cada uno en su propio archivo Excel."""
-    archivos_generados = []
+def _registrar_estilos_excel(wb):
+    """Registra en el libro los estilos con nombre compartidos por todas las hojas."""
+    from openpyxl.styles import PatternFill, Font, Alignment, Border, Side, NamedStyle
+    
+    thin_border = Border(
+        left=Side(style='thin', color='000000'),
+        right=Side(style='thin', color='000000'),
+        top=Side(style='thin', color='000000'),
+        bottom=Side(style='thin', color='000000')
+    )
+    wb.add_named_style(NamedStyle(
+        'encabezado', border=thin_border,
+        fill=PatternFill(start_color='2F5496', end_color='2F5496', fill_type='solid'),
+        font=Font(bold=True, color='FFFFFF', size=11),
+        alignment=Alignment(horizontal='center', vertical='center')))
+    wb.add_named_style(NamedStyle(
+        'franja', border=thin_border,
+        fill=PatternFill(start_color='D0CECE', end_color='D0CECE', fill_type='solid'),
+        font=Font(bold=True, size=9),
+        alignment=Alignment(horizontal='center', vertical='center')))
+    wb.add_named_style(NamedStyle(
+        'celda_vacia', border=thin_border,
+        fill=PatternFill(start_color='FFFFFF', end_color='FFFFFF', fill_type='solid'),
+        alignment=Alignment(wrap_text=True, vertical='center', horizontal='center')))
+    return thin_border
+
+def _estilo_curso(wb, color, thin_border):
+    """Nombre del estilo de un color de asignatura; se registra la primera vez que se usa."""
+    nombre = f"curso_{color}"
+    if nombre not in wb.named_styles:
+        from openpyxl.styles import PatternFill, Font, Alignment, NamedStyle
+        wb.add_named_style(NamedStyle(
+            nombre, border=thin_border,
+            fill=PatternFill(start_color=color, end_color=color, fill_type='solid'),
+            font=Font(size=9),
+            alignment=Alignment(wrap_text=True, vertical='center', horizontal='center')))
+    return nombre
+
+def _escribir_hoja_streaming(wb, titulo, df_horario, max_colisiones, franjas_activas, thin_border):
+    """Escribe un horario fila a fila en una hoja de un libro write_only."""
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.utils import get_column_letter
+    from openpyxl.worksheet.cell_range import CellRange
+    
+    ws = wb.create_sheet(title=titulo)
+    
+    def celda(valor, estilo):
+        cell = WriteOnlyCell(ws, value=valor)
+        cell.style = estilo
+        return cell
+    
+    # Anchos y merges deben definirse antes de escribir las filas
+    ws.column_dimensions[get_column_letter(1)].width = 15
+    encabezado = [celda("HORARIO", 'encabezado')]
+    col_actual = 2
+    for dia in DIAS:
+        num_subcols = max_colisiones[dia]
+        for idx_sub in range(num_subcols):
+            encabezado.append(celda(dia if idx_sub == 0 else None, 'encabezado'))
+            ws.column_dimensions[get_column_letter(col_actual + idx_sub)].width = 45
+        if num_subcols > 1:
+            ws.merged_cells.add(CellRange(min_col=col_actual, min_row=1,
+                                          max_col=col_actual + num_subcols - 1, max_row=1))
+        col_actual += num_subcols
+    ws.append(encabezado)
+    
+    alto_fila = _alto_fila_excel(df_horario)
+    for fila_actual, franja in enumerate(franjas_activas, start=2):
+        ws.row_dimensions[fila_actual].height = alto_fila
+        fila = [celda(franja, 'franja')]
+        for dia in DIAS:
+            cursos = df_horario[dia][franja]
+            for idx_sub in range(max_colisiones[dia]):
+                valor = cursos[idx_sub] if idx_sub < len(cursos) else ""
+                if valor and valor.strip():
+                    estilo = _estilo_curso(wb, color_curso(valor), thin_border)
+                else:
+                    estilo = 'celda_vacia'
+                fila.append(celda(valor, estilo))
+        ws.append(fila)
+        contar("excel.celdas", len(fila))
+
+def exportar_horario_excel_streaming(df_horario, max_colisiones, franjas_activas, ciclo,
+                                     file_path=None, vista='ciclo'):
+    """
+    Igual que exportar_horario_excel, pero con un libro write_only: las filas se escriben
+    en flujo con WriteOnlyCell y estilos con nombre compartidos, sin mantener la hoja en memoria.
+    """
+    from openpyxl import Workbook
+    
+    file_path = file_path or OUTPUT_DIR / _nombre_archivo(vista, ciclo, "xlsx")
+    wb = Workbook(write_only=True)
+    thin_border = _registrar_estilos_excel(wb)
+    _escribir_hoja_streaming(wb, _titulo_hoja(vista, ciclo), df_horario, max_colisiones,
+                             franjas_activas, thin_border)
+    with etapa("excel.save"):
+        wb.save(_ruta_salida(file_path))
+    print(f"📊 Excel exportado: {file_path}")
+    return str(file_path)
+
+def exportar_libro_excel(horarios_dict, max_colisiones_dict, franjas_activas_dict, file_path=None,
+                         vista='ciclo'):
+    """Exporta todos los ciclos a un único libro Excel (write_only), una hoja por ciclo."""
+    from openpyxl import Workbook
+    
+    file_path = file_path or OUTPUT_DIR / _nombre_completo(vista, "xlsx")
+    wb = Workbook(write_only=True)
+    thin_border = _registrar_estilos_excel(wb)
+    for ciclo in sorted(list(horarios_dict.keys())):
+        _escribir_hoja_streaming(wb, _titulo_hoja(vista, ciclo), horarios_dict[ciclo],
+                                 max_colisiones_dict[ciclo], franjas_activas_dict[ciclo],
+                                 thin_border)
+    with etapa("excel.save"):
+        wb.save(_ruta_salida(file_path))
+    print(f"📊 Libro Excel completo: {file_path}")
+    return str(file_path)
+
+def _exportar_archivos(exportador, extension, etiqueta, horarios_dict, max_colisiones_dict,
+                       franjas_activas_dict, workers=1, progreso=None, vista='ciclo',
+                       cache=True):
+    """Un archivo por ciclo con `exportador`, omitiendo los que la caché da por vigentes."""
     ciclos = sorted(list(horarios_dict.keys()))
+    cache = CacheExportacion() if cache else None
     
+    # La ruta se resuelve aquí: con spawn los procesos no ven cambios a OUTPUT_DIR
+    trabajos, huellas, vigentes = [], {}, {}
     for ciclo in ciclos:
-        file_path = exportar_horario_excel(
-            horarios_dict[ciclo],
-            max_colisiones_dict[ciclo],
-            franjas_activas_dict[ciclo],
-            ciclo
-        )
-        archivos_generados.append(file_path)
-    
-    print(f"\n✅ Total de {len(archivos_generados)} archivos Excel generados")
-    return archivos_generados
\ No newline at end of file
+        archivo = OUTPUT_DIR / _nombre_archivo(vista, ciclo, extension)
+        if cache:
+            huellas[ciclo] = huella_exportacion(horarios_dict[ciclo], max_colisiones_dict[ciclo],
+                                                franjas_activas_dict[ciclo], ciclo,
+                                                exportador.__name__, vista)
+            if cache.vigente(archivo, huellas[ciclo]):
+                vigentes[ciclo] = str(archivo)
+                continue
+        trabajos.append((ciclo, (horarios_dict[ciclo], max_colisiones_dict[ciclo],
+                                 franjas_activas_dict[ciclo], ciclo, archivo, vista)))
+    
+    resultados, errores = _ejecutar_por_ciclo(exportador, trabajos, workers, progreso)
+    if cache:
+        for ciclo, archivo in resultados.items():
+            cache.registrar(archivo, huellas[ciclo])
+        cache.guardar()
+    resultados.update(vigentes)
+    archivos_generados = [resultados[ciclo] for ciclo in ciclos if ciclo in resultados]
+    
+    if vigentes:
+        print(f"♻️ {len(vigentes)} archivo(s) {etiqueta} sin cambios")
+    print(f"\n✅ Total de {len(archivos_generados)} archivos {etiqueta} generados")
+    if errores:
+        raise ExportacionError(errores, archivos_generados)
+    return archivos_generados
+
+def exportar_todos_excel(horarios_dict, max_colisiones_dict, franjas_activas_dict,
+                         workers=1, progreso=None, streaming=False, vista='ciclo', cache=True):
+    """
+    Exporta todos los ciclos, cada uno en su propio archivo Excel.
+    Con workers > 1 los libros se generan en paralelo en un pool de procesos.
+    Con streaming=True se usa exportar_horario_excel_streaming.
+    Con `vista` (p. ej. 'profesor_nombre') las claves son docentes, aulas o grupos.
+    Con cache=True se omiten los ciclos cuyo archivo ya está al día (CacheExportacion).
+    """
+    exportador = exportar_horario_excel_streaming if streaming else exportar_horario_excel
+    return _exportar_archivos(exportador, "xlsx", "Excel", horarios_dict, max_colisiones_dict,
+                              franjas_activas_dict, workers, progreso, vista, cache)
+
+# formato -> (extensión, exportador de un horario). Todo exportador recibe
+# (df_horario, max_colisiones, franjas_activas, ciclo, file_path=None, vista='ciclo');
+# como "modulo:funcion" su módulo se importa recién al usarlo
+EXPORTADORES = {
+    'pdf': ("pdf", exportar_a_pdf),
+    'excel': ("xlsx", exportar_horario_excel),
+    'json': ("json", "emisores:exportar_json"),
+    'csv': ("csv", "emisores:exportar_csv"),
+    'html': ("html", "emisores:exportar_html"),
+}
+
+def registrar_exportador(formato, extension, exportador):
+    """Agrega (o reemplaza) un formato; `exportador` es una función o "modulo:funcion"."""
+    EXPORTADORES[formato] = (extension, exportador)
+
+def obtener_exportador(formato):
+    """Retorna (extensión, función) de `formato`, importando su módulo si hace falta."""
+    try:
+        extension, exportador = EXPORTADORES[formato]
+    except KeyError:
+        raise ValueError(f"Formato desconocido: {formato} "
+                         f"(disponibles: {', '.join(EXPORTADORES)})") from None
+    if isinstance(exportador, str):
+        modulo, nombre = exportador.split(":")
+        exportador = getattr(importlib.import_module(modulo), nombre)
+    return extension, exportador
+
+def exportar_todos(formato, horarios_dict, max_colisiones_dict, franjas_activas_dict,
+                   workers=1, progreso=None, vista='ciclo', cache=True):
+    """
+    Exporta cada ciclo a su propio archivo con el exportador registrado para `formato`
+    ('pdf', 'excel', 'json', 'csv', 'html', ...). Para el PDF único de todos los ciclos
+    está exportar_todos_pdf.
+    """
+    extension, exportador = obtener_exportador(formato)
+    etiqueta = "Excel" if formato == "excel" else formato.upper()
+    return _exportar_archivos(exportador, extension, etiqueta, horarios_dict,
+                              max_colisiones_dict, franjas_activas_dict, workers, progreso,
+                              vista, cache)
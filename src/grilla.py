@@ -0,0 +1,128 @@
+"""
+Grilla compacta de horarios: una matriz de ids de curso por día y una tabla de cursos internados
+"""
+from collections.abc import Mapping
+
+import numpy as np
+
+from utils import FRANJAS
+
+VACIO = 0
+
+
+class TablaCursos:
+    """
+    Guarda cada texto de curso una sola vez y lo referencia por un id entero.
+    El id 0 (VACIO) corresponde a la celda vacía "".
+    """
+
+    def __init__(self):
+        self.textos = [""]
+        self._ids = {"": VACIO}
+
+    def id(self, texto):
+        """Devuelve el id del texto, registrándolo si es nuevo."""
+        id_curso = self._ids.get(texto)
+        if id_curso is None:
+            id_curso = len(self.textos)
+            self._ids[texto] = id_curso
+            self.textos.append(texto)
+        return id_curso
+
+    def __getitem__(self, id_curso):
+        return self.textos[id_curso]
+
+    def __len__(self):
+        return len(self.textos)
+
+
+def compactar_cursos(horarios, cursos):
+    """
+    Vuelve a internar en una TablaCursos nueva solo los cursos que usan `horarios`
+    (una lista de {dia: matriz}). Retorna: (lista de {dia: matriz remapeada}, tabla nueva)
+    """
+    matrices = [matriz for horario in horarios for matriz in horario.values()]
+    usados = np.unique(np.concatenate([matriz.ravel() for matriz in matrices]
+                                      + [np.array([VACIO], dtype=np.int32)]))
+    nueva = TablaCursos()
+    nuevos = np.zeros(int(usados[-1]) + 1, dtype=np.int32)
+    nuevos[usados] = [nueva.id(cursos.textos[id_curso]) for id_curso in usados.tolist()]
+    return [{dia: nuevos[matriz] for dia, matriz in horario.items()} for horario in horarios], nueva
+
+
+class DiaGrilla(Mapping):
+    """
+    Vista de un día como {franja: [curso_subcol_0, curso_subcol_1, ...]}.
+    La matriz tiene forma (franjas, subcolumnas) y guarda ids de TablaCursos.
+    """
+
+    def __init__(self, matriz, cursos, franjas=FRANJAS):
+        self.matriz = matriz
+        self.cursos = cursos
+        self.franjas = franjas
+        self._indices = {franja: idx for idx, franja in enumerate(franjas)}
+
+    @property
+    def num_subcolumnas(self):
+        return self.matriz.shape[1]
+
+    def __getitem__(self, franja):
+        # Se devuelve una lista nueva: los consumidores pueden rellenarla sin alterar la grilla
+        textos = self.cursos.textos
+        return [textos[id_curso] for id_curso in self.matriz[self._indices[franja]].tolist()]
+
+    def __iter__(self):
+        return iter(self.franjas)
+
+    def __len__(self):
+        return len(self.franjas)
+
+
+class HorarioGrilla(Mapping):
+    """
+    Horario de un ciclo como {dia: DiaGrilla}.
+    Conserva el acceso df_horario[dia][franja] que usan exportar.py y visualizacion.py.
+    """
+
+    def __init__(self, matrices, cursos, franjas=FRANJAS):
+        self.matrices = matrices
+        self.cursos = cursos
+        self.franjas = franjas
+        self._dias = {
+            dia: DiaGrilla(matriz, cursos, franjas) for dia, matriz in matrices.items()
+        }
+
+    @classmethod
+    def vacio(cls, dias, cursos, franjas=FRANJAS):
+        """Horario sin clases: cada día con 0 subcolumnas."""
+        matrices = {dia: np.zeros((len(franjas), 0), dtype=np.int32) for dia in dias}
+        return cls(matrices, cursos, franjas)
+
+    def compactar(self):
+        """
+        Copia del horario con una TablaCursos propia que solo tiene sus cursos.
+        La tabla compartida guarda los cursos de todo el conjunto de datos.
+        """
+        (matrices,), cursos = compactar_cursos([self.matrices], self.cursos)
+        return type(self)(matrices, cursos, self.franjas)
+
+    def __reduce__(self):
+        # Al enviarse a otro proceso (exportación en paralelo) viaja solo con sus cursos
+        compacto = self.compactar()
+        return type(self), (compacto.matrices, compacto.cursos, compacto.franjas)
+
+    def franjas_activas(self):
+        """Franjas que tienen al menos 1 curso en algún día."""
+        activas = np.zeros(len(self.franjas), dtype=bool)
+        for matriz in self.matrices.values():
+            activas |= (matriz != VACIO).any(axis=1)
+        return [franja for franja, activa in zip(self.franjas, activas) if activa]
+
+    def __getitem__(self, dia):
+        return self._dias[dia]
+
+    def __iter__(self):
+        return iter(self._dias)
+
+    def __len__(self):
+        return len(self._dias)
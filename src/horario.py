@@ -1,122 +1,407 @@
+import heapq
+import threading
+from collections.abc import Mapping
+import numpy as np
 import pandas as pd
-from utils import FRANJAS, franjas_ocupadas
+from grilla import VACIO, HorarioGrilla, TablaCursos
+from instrumentacion import contar, medido
+from utils import FRANJAS, rangos_franjas
 import unicodedata
 
 DIAS = ["LUNES", "MARTES", "MIERCOLES", "JUEVES", "VIERNES"]
 
+# optima: mínimo de subcolumnas; agrupada: el mismo mínimo, con las secciones de una
+# misma asignatura en la misma subcolumna o en subcolumnas contiguas
+DISPOSICIONES = ('optima', 'agrupada')
+
 def quitar_acentos(texto):
     return ''.join(c for c in unicodedata.normalize('NFD', texto) if unicodedata.category(c) != 'Mn')
 
-def detectar_max_colisiones(df, ciclo, dia):
+def normalizar_dia(serie):
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        # Solo se normalizan las categorías, no cada fila
+        return serie.map({dia: str(dia).strip().upper() for dia in serie.cat.categories})
+    return serie.astype(str).str.strip().str.upper()
+
+@medido("preparar_clases")
+def preparar_clases(df, columnas=(), franjas=FRANJAS):
     """
-    Detecta el máximo número de cursos simultáneos en un día.
+    Normaliza las clases una sola vez: día en mayúsculas, rango de franjas
+    [primera, ultima) de la grilla `franjas` e información a mostrar de cada curso.
+    `columnas` agrega columnas de recurso (p. ej. 'profesor_nombre') sin espacios extra.
+    """
+    if 'minuto_inicio' in df:
+        # Minutos ya calculados (caché columnar de cache_datos)
+        inicios, fines = df['minuto_inicio'].to_numpy(), df['minuto_fin'].to_numpy()
+        primeras, ultimas = franjas.rangos(inicios, fines)
+        # Una hora inválida (MINUTO_INVALIDO) deja la clase sin franjas
+        ultimas = np.where((inicios < 0) | (fines < 0), primeras, ultimas)
+    else:
+        primeras, ultimas = rangos_franjas(df['hora_inicio'], df['hora_fin'], franjas)
+    infos = [
+        f"{asignatura} - {profesor} - {grupo} - {aula}"
+        for asignatura, profesor, grupo, aula in zip(
+            df['asignatura_nombre'], df['profesor_nombre'],
+            df['grupo_nombre'], df['aula_nombre'])
+    ]
+    clases = pd.DataFrame({
+        'ciclo': df['ciclo'].to_numpy(),
+        'dia': normalizar_dia(df['dia']).to_numpy(),
+        'primera': primeras,
+        'ultima': ultimas,
+        'info': infos,
+    })
+    for columna in columnas:
+        if columna not in clases:
+            clases[columna] = pd.Series(df[columna].to_numpy(), dtype=object).str.strip()
+    return clases
+
+def _acumular_ocupacion(codigos, primeras, ultimas, num_grupos, num_franjas=len(FRANJAS)):
+    """Arreglo de diferencias por grupo: +1 en la primera franja, -1 tras la última."""
+    diferencias = np.zeros((num_grupos, num_franjas + 1), dtype=np.int64)
+    np.add.at(diferencias, (codigos, primeras), 1)
+    np.add.at(diferencias, (codigos, ultimas), -1)
+    return np.cumsum(diferencias, axis=1)[:, :-1]
+
+def calcular_ocupacion(df, franjas=FRANJAS):
+    """
+    Cuenta los cursos por franja de cada (ciclo, dia) en una sola pasada.
+    Usa un arreglo de diferencias: +1 en la primera franja de cada clase,
+    -1 tras la última, y una suma acumulada por fila.
+    
+    Retorna: {(ciclo, dia): array con el número de cursos en cada franja}
     """
-    df_ciclo = df[df['ciclo'] == ciclo].copy()
-    df_ciclo = df_ciclo[df_ciclo['dia'].str.strip().str.upper() == dia]
+    if df.empty:
+        return {}
     
-    colisiones = {}
+    clases = preparar_clases(df, franjas=franjas)
+    agrupado = clases.groupby(['ciclo', 'dia'], sort=False)
+    codigos = agrupado.ngroup().to_numpy()
+    ocupacion = _acumular_ocupacion(codigos, clases['primera'].to_numpy(),
+                                    clases['ultima'].to_numpy(), agrupado.ngroups, len(franjas))
+    
+    return {clave: ocupacion[codigos[filas[0]]] for clave, filas in agrupado.indices.items()}
+
+@medido("detectar_max_colisiones")
+def detectar_max_colisiones(df, ciclo, dia, ocupacion=None, franjas=FRANJAS):
+    """
+    Detecta el máximo número de cursos simultáneos en un día.
+    Si se pasa `ocupacion` (de calcular_ocupacion) no se vuelve a recorrer el DataFrame.
+    """
+    if ocupacion is None:
+        ocupacion = calcular_ocupacion(df[df['ciclo'] == ciclo], franjas)
     
-    for franja in FRANJAS:
-        cursos_en_franja = 0
-        for _, row in df_ciclo.iterrows():
-            franjas = franjas_ocupadas(row['hora_inicio'], row['hora_fin'])
-            if franja in franjas:
-                cursos_en_franja += 1
-        colisiones[franja] = cursos_en_franja
+    conteo = ocupacion.get((ciclo, dia))
+    colisiones = {
+        franja: int(conteo[idx_franja]) if conteo is not None else 0
+        for idx_franja, franja in enumerate(franjas)
+    }
     
     max_colisiones = max(colisiones.values()) if colisiones else 1
     return max_colisiones, colisiones
 
-def crear_horario_ciclo(df, ciclo):
+def asignar_subcolumnas(intervalos):
     """
-    Crea un horario con subcolunas dinámicas.
-    GARANTIZA que cada curso mantenga su subcolumna en TODAS sus franjas.
+    Asigna a cada intervalo de franjas [primera, ultima) una subcolumna fija
+    (coloreo de un grafo de intervalos).
+    Recorre los intervalos por franja de inicio con dos montículos: subcolumnas
+    ocupadas ordenadas por franja de fin y subcolumnas libres ordenadas por índice.
+    Usa exactamente tantas subcolumnas como el máximo de cursos simultáneos.
     
-    Retorna: (df_horario, max_colisiones_por_dia, franjas_activas)
+    Retorna: (subcolumnas, num_subcolumnas), subcolumnas en el orden de entrada
     """
-    df_ciclo = df[df['ciclo'] == ciclo].copy()
+    orden = sorted(range(len(intervalos)), key=lambda i: intervalos[i][0])
+    subcolumnas = [0] * len(intervalos)
+    ocupadas = []  # (ultima, subcolumna)
+    libres = []
+    num_subcolumnas = 0
     
-    # Calcular máximo de colisiones por día
-    max_colisiones_por_dia = {}
-    for dia in DIAS:
-        max_col, _ = detectar_max_colisiones(df, ciclo, dia)
-        max_colisiones_por_dia[dia] = max_col
+    for i in orden:
+        primera, ultima = intervalos[i]
+        # Liberar las subcolumnas cuyos cursos terminaron antes de esta franja
+        while ocupadas and ocupadas[0][0] <= primera:
+            heapq.heappush(libres, heapq.heappop(ocupadas)[1])
+        
+        if libres:
+            subcolumna = heapq.heappop(libres)
+        else:
+            subcolumna = num_subcolumnas
+            num_subcolumnas += 1
+        
+        subcolumnas[i] = subcolumna
+        heapq.heappush(ocupadas, (ultima, subcolumna))
+    
+    return subcolumnas, num_subcolumnas
+
+def asignar_subcolumnas_agrupadas(intervalos, grupos):
+    """
+    Igual que asignar_subcolumnas (mismo número mínimo de subcolumnas), pero agrupando
+    por `grupos` (p. ej. códigos de asignatura, uno por intervalo):
     
-    # Crear estructura: {dia: {franja: [curso1, curso2, ...]}}
-    df_horario = {}
-    for dia in DIAS:
-        df_horario[dia] = {franja: [] for franja in FRANJAS}
+    1. En el barrido, un curso reutiliza la última subcolumna de su grupo si está libre;
+       si no, toma la libre de menor índice. Cualquier subcolumna libre es válida: solo
+       se abre una nueva cuando todas están ocupadas, así que el total no cambia.
+    2. Las subcolumnas se reordenan (se permutan enteras, sin crear choques) para que
+       las dominadas por un mismo grupo queden contiguas, en orden de aparición.
     
-    # Ordenar por hora de inicio para procesamiento ordenado
-    df_ciclo = df_ciclo.sort_values('hora_inicio')
+    Cuesta O(n log n). Retorna: (subcolumnas, num_subcolumnas), en el orden de entrada
+    """
+    orden = sorted(range(len(intervalos)), key=lambda i: (intervalos[i][0], grupos[i]))
+    subcolumnas = [0] * len(intervalos)
+    ocupadas = []  # (ultima, subcolumna)
+    libres = []    # montículo con borrado diferido: se valida con `libre`
+    libre = []
+    ultima_de_grupo = {}
+    num_subcolumnas = 0
     
-    # PASO CRÍTICO: Asignar cada curso a UNA subcolumna fija
-    for _, row in df_ciclo.iterrows():
-        info = f"{row['asignatura_nombre']} - {row['profesor_nombre']} - {row['grupo_nombre']} - {row['aula_nombre']}"
-        franjas = franjas_ocupadas(row['hora_inicio'], row['hora_fin'])
-        dia = row['dia'].strip().upper()
-        
-        if dia not in DIAS or not franjas:
-            continue
-        
-        # 1. Encontrar la PRIMERA franja del curso
-        primera_franja = franjas[0]
+    for i in orden:
+        primera, ultima = intervalos[i]
+        while ocupadas and ocupadas[0][0] <= primera:
+            subcolumna = heapq.heappop(ocupadas)[1]
+            libre[subcolumna] = True
+            heapq.heappush(libres, subcolumna)
         
-        # 2. Buscar en qué subcolumna podemos colocar este curso
-        # Buscamos la primera posición libre en la primera franja
-        subcolumna_asignada = None
+        subcolumna = ultima_de_grupo.get(grupos[i])
+        if subcolumna is None or not libre[subcolumna]:
+            while libres and not libre[libres[0]]:
+                heapq.heappop(libres)
+            if libres:
+                subcolumna = heapq.heappop(libres)
+            else:
+                subcolumna = num_subcolumnas
+                num_subcolumnas += 1
+                libre.append(False)
         
-        # Revisar cada posible subcolumna
-        for idx_sub in range(max_colisiones_por_dia[dia]):
-            # Verificar si esta subcolumna está libre en TODAS las franjas del curso
-            subcolumna_libre = True
-            
-            for franja in franjas:
-                # Asegurar que la lista tenga suficientes elementos
-                while len(df_horario[dia][franja]) <= idx_sub:
-                    df_horario[dia][franja].append(None)
-                
-                # Si ya hay algo en esta posición, no está libre
-                if df_horario[dia][franja][idx_sub] is not None:
-                    subcolumna_libre = False
-                    break
-            
-            # Si encontramos una subcolumna libre en todas las franjas
-            if subcolumna_libre:
-                subcolumna_asignada = idx_sub
-                break
-        
-        # Si no encontramos subcolumna libre, crear una nueva
-        if subcolumna_asignada is None:
-            subcolumna_asignada = max(len(df_horario[dia][franjas[0]]) for franja in franjas)
+        libre[subcolumna] = False
+        subcolumnas[i] = subcolumna
+        ultima_de_grupo[grupos[i]] = subcolumna
+        heapq.heappush(ocupadas, (ultima, subcolumna))
+    
+    # Grupo dominante de cada subcolumna: el que ocupa más franjas en ella
+    franjas_por_grupo = {}
+    aparicion = {}
+    for i in orden:
+        primera, ultima = intervalos[i]
+        aparicion.setdefault(grupos[i], len(aparicion))
+        clave = (subcolumnas[i], grupos[i])
+        franjas_por_grupo[clave] = franjas_por_grupo.get(clave, 0) + ultima - primera
+    dominante = {}
+    for (subcolumna, grupo), franjas in franjas_por_grupo.items():
+        if franjas > dominante.get(subcolumna, (0, None))[0]:
+            dominante[subcolumna] = (franjas, grupo)
+    
+    nuevo_orden = sorted(range(num_subcolumnas),
+                         key=lambda subcolumna: (aparicion[dominante[subcolumna][1]], subcolumna))
+    nuevo_indice = {anterior: nuevo for nuevo, anterior in enumerate(nuevo_orden)}
+    return [nuevo_indice[subcolumna] for subcolumna in subcolumnas], num_subcolumnas
+
+def construir_dia(primeras, ultimas, ids, num_subcols=None, grupos=None, franjas=FRANJAS):
+    """
+    Matriz (franjas × subcolumnas) de un día a partir de sus clases: rangos de franjas
+    [primera, ultima) e ids de curso. Cada día tiene tantas subcolumnas como su
+    máximo de colisiones. Con `grupos` (un código de asignatura por clase) se usa la
+    disposición agrupada.
+    """
+    # PASO CRÍTICO: Asignar cada curso a UNA subcolumna fija
+    intervalos = list(zip(primeras, ultimas))
+    if grupos is None:
+        subcolumnas, necesarias = asignar_subcolumnas(intervalos)
+    else:
+        subcolumnas, necesarias = asignar_subcolumnas_agrupadas(intervalos, grupos)
+    if num_subcols is None:
+        num_subcols = necesarias
+    matriz = np.full((len(franjas), num_subcols), VACIO, dtype=np.int32)
+    
+    # Colocar el curso en la subcolumna asignada en TODAS sus franjas
+    for primera, ultima, id_curso, subcolumna in zip(primeras, ultimas, ids, subcolumnas):
+        matriz[primera:ultima, subcolumna] = id_curso
+    return matriz
+
+def crear_horarios_todos(df, ciclos=None, disposicion='optima', franjas=FRANJAS):
+    """
+    Crea los horarios de todos los ciclos en una sola pasada agrupada por (ciclo, dia).
+    Los datos se normalizan una vez y cada grupo calcula su ocupación y sus subcolumnas.
+    Si no se indican `ciclos` se usan todos los presentes en el DataFrame.
+    `disposicion` es una de DISPOSICIONES y `franjas` una GrillaFranjas.
+    
+    Cada horario es una HorarioGrilla: una matriz de ids por día y una tabla de
+    cursos compartida por todos los ciclos, con acceso df_horario[dia][franja].
+    
+    Retorna: (horarios_dict, max_colisiones_dict, franjas_activas_dict)
+    """
+    columnas = ['asignatura_nombre'] if disposicion == 'agrupada' else []
+    clases = preparar_clases(df, columnas, franjas)
+    if ciclos is None:
+        ciclos = sorted(clases['ciclo'].unique().tolist())
+    return construir_horarios(clases, ciclos, TablaCursos(), disposicion=disposicion,
+                              franjas=franjas)
+
+@medido("construir_horarios")
+def construir_horarios(clases, ciclos, cursos, clave='ciclo', disposicion='optima',
+                       franjas=FRANJAS):
+    """
+    Construye los horarios de `ciclos` a partir de clases ya normalizadas
+    (preparar_clases con la misma grilla `franjas`), registrando los textos en la
+    tabla `cursos`.
+    Con `clave` se agrupa por otra columna (docente, aula, grupo): `ciclos` son
+    entonces los valores de esa columna.
+    La disposición 'agrupada' necesita la columna asignatura_nombre en `clases`.
+    
+    Retorna: (horarios_dict, max_colisiones_dict, franjas_activas_dict)
+    """
+    if disposicion not in DISPOSICIONES:
+        raise ValueError(f"Disposición desconocida: {disposicion} "
+                         f"(disponibles: {', '.join(DISPOSICIONES)})")
+    if disposicion == 'agrupada' and 'asignatura_nombre' not in clases:
+        raise ValueError("La disposición 'agrupada' necesita clases preparadas con "
+                         "preparar_clases(df, ['asignatura_nombre'])")
+    clases = clases[clases['dia'].isin(DIAS) & (clases['primera'] < clases['ultima'])]
+    clases = clases[clases[clave].isin(ciclos)].reset_index(drop=True)
+    contar("clases_procesadas", len(clases))
+    
+    # Sin clases un día queda con 0 subcolumnas, igual que detectar_max_colisiones
+    max_colisiones_dict = {ciclo: {dia: 0 for dia in DIAS} for ciclo in ciclos}
+    matrices_dict = {
+        ciclo: {dia: np.zeros((len(franjas), 0), dtype=np.int32) for dia in DIAS}
+        for ciclo in ciclos
+    }
+    
+    agrupado = clases.groupby([clave, 'dia'], sort=False)
+    codigos = agrupado.ngroup().to_numpy()
+    primeras = clases['primera'].to_numpy()
+    ultimas = clases['ultima'].to_numpy()
+    ids = np.array([cursos.id(info) for info in clases['info']], dtype=np.int32)
+    ocupacion = _acumular_ocupacion(codigos, primeras, ultimas, agrupado.ngroups, len(franjas))
+    asignaturas = None
+    if disposicion == 'agrupada':
+        asignaturas = pd.factorize(clases['asignatura_nombre'])[0]
+    
+    for (ciclo, dia), filas in agrupado.indices.items():
+        num_subcols = int(ocupacion[codigos[filas[0]]].max())
+        max_colisiones_dict[ciclo][dia] = num_subcols
+        grupos = asignaturas[filas].tolist() if asignaturas is not None else None
+        matrices_dict[ciclo][dia] = construir_dia(primeras[filas], ultimas[filas], ids[filas],
+                                                  num_subcols, grupos, franjas)
+    
+    horarios_dict = {
+        ciclo: HorarioGrilla(matrices_dict[ciclo], cursos, franjas) for ciclo in ciclos
+    }
+    franjas_activas_dict = {
+        ciclo: horarios_dict[ciclo].franjas_activas() for ciclo in ciclos
+    }
+    return horarios_dict, max_colisiones_dict, franjas_activas_dict
+
+def crear_horario_ciclo(df, ciclo, franjas=FRANJAS):
+    """
+    Crea un horario con subcolunas dinámicas.
+    GARANTIZA que cada curso mantenga su subcolumna en TODAS sus franjas.
+    
+    Retorna: (df_horario, max_colisiones_por_dia, franjas_activas)
+    """
+    horarios, max_colisiones, franjas_activas = crear_horarios_todos(
+        df[df['ciclo'] == ciclo], [ciclo], franjas=franjas)
+    return horarios[ciclo], max_colisiones[ciclo], franjas_activas[ciclo]
+
+
+COLUMNAS_VISTA = ('ciclo', 'profesor_nombre', 'aula_nombre', 'grupo_nombre')
+
+class IndiceVistas:
+    """
+    Índice {columna: {valor: filas}} sobre clases normalizadas una sola vez, para
+    armar horarios por ciclo, docente, aula o grupo sin volver a filtrar el DataFrame.
+    Todas las vistas comparten la misma tabla de cursos y la grilla `franjas`.
+    """
+
+    def __init__(self, df, columnas=COLUMNAS_VISTA, franjas=FRANJAS):
+        self.columnas = tuple(columnas)
+        self.franjas = franjas
+        # asignatura_nombre se guarda para la disposición agrupada
+        self._clases = preparar_clases(df, self.columnas + ('asignatura_nombre',), franjas)
+        self._filas = {columna: self._clases.groupby(columna).indices for columna in self.columnas}
+        self._cursos = TablaCursos()
+
+    def valores(self, clave):
+        """Valores distintos de `clave` (p. ej. todos los docentes), ordenados."""
+        return sorted(self._filas[clave])
+
+    def horarios(self, clave, valores=None, disposicion='optima'):
+        """
+        Horarios de todos los `valores` de `clave` en una sola pasada agrupada.
+        Retorna: (horarios_dict, max_colisiones_dict, franjas_activas_dict)
+        """
+        if valores is None:
+            valores = self.valores(clave)
+        filas = [self._filas[clave][valor] for valor in valores if valor in self._filas[clave]]
+        clases = self._clases.iloc[np.concatenate(filas)] if filas else self._clases.iloc[:0]
+        return construir_horarios(clases, list(valores), self._cursos, clave, disposicion,
+                                  self.franjas)
+
+    def horario(self, clave, valor, disposicion='optima'):
+        """Retorna (df_horario, max_colisiones_por_dia, franjas_activas) de un valor."""
+        horarios, max_colisiones, franjas_activas = self.horarios(clave, [valor], disposicion)
+        return horarios[valor], max_colisiones[valor], franjas_activas[valor]
+
+def crear_horario(df, clave, valor, franjas=FRANJAS):
+    """
+    Horario de un ciclo, docente, aula o grupo: crear_horario(df, 'profesor_nombre', 'Ana Ruiz').
+    Para muchas vistas conviene crear un IndiceVistas y reutilizarlo.
+    
+    Retorna: (df_horario, max_colisiones_por_dia, franjas_activas)
+    """
+    return IndiceVistas(df, [clave], franjas).horario(clave, valor)
+
+
+class HorariosDiferidos:
+    """
+    Construye cada ciclo solo la primera vez que se pide y lo guarda.
+    `horarios`, `max_colisiones` y `franjas_activas` son vistas {ciclo: ...} con la
+    misma forma que los diccionarios de crear_horarios_todos, así que pueden pasarse
+    directamente a mostrar_horarios_navegables y a los exportadores.
+    Es segura entre hilos: la interfaz puede precargar ciclos en segundo plano.
+    """
+
+    def __init__(self, df, ciclos=None, franjas=FRANJAS):
+        self._df = df
+        self.franjas = franjas
+        self._filas_por_ciclo = df.groupby('ciclo').indices
+        if ciclos is None:
+            ciclos = sorted(df['ciclo'].unique().tolist())
+        self.ciclos = list(ciclos)
+        self._cursos = TablaCursos()
+        self._construidos = {}
+        self._lock = threading.Lock()
         
-        # 3. Asignar el curso a la subcolumna encontrada en TODAS sus franjas
-        for franja in franjas:
-            # Asegurar que la lista tenga suficiente espacio
-            while len(df_horario[dia][franja]) <= subcolumna_asignada:
-                df_horario[dia][franja].append(None)
-            
-            # Colocar el curso en la posición asignada
-            df_horario[dia][franja][subcolumna_asignada] = info
-    
-    # Limpiar None y convertir a strings vacíos
-    for dia in DIAS:
-        for franja in FRANJAS:
-            # Convertir None a string vacío
-            df_horario[dia][franja] = [
-                c if c is not None else "" 
-                for c in df_horario[dia][franja]
-            ]
-    
-    # Detectar franjas activas (que tengan al menos 1 curso)
-    franjas_activas = []
-    for franja in FRANJAS:
-        tiene_contenido = False
-        for dia in DIAS:
-            if any(c != "" for c in df_horario[dia][franja]):
-                tiene_contenido = True
-                break
-        if tiene_contenido:
-            franjas_activas.append(franja)
-    
-    return df_horario, max_colisiones_por_dia, franjas_activas
\ No newline at end of file
+        self.horarios = _VistaDiferida(self, 0)
+        self.max_colisiones = _VistaDiferida(self, 1)
+        self.franjas_activas = _VistaDiferida(self, 2)
+
+    def obtener(self, ciclo):
+        """Retorna (df_horario, max_colisiones_por_dia, franjas_activas) del ciclo."""
+        with self._lock:
+            if ciclo not in self._construidos:
+                filas = self._filas_por_ciclo.get(ciclo, [])
+                clases = preparar_clases(self._df.iloc[filas], franjas=self.franjas)
+                horarios, max_colisiones, franjas_activas = construir_horarios(
+                    clases, [ciclo], self._cursos, franjas=self.franjas)
+                self._construidos[ciclo] = (
+                    horarios[ciclo], max_colisiones[ciclo], franjas_activas[ciclo])
+            return self._construidos[ciclo]
+
+
+class _VistaDiferida(Mapping):
+    """Vista {ciclo: componente} sobre HorariosDiferidos."""
+
+    def __init__(self, fuente, componente):
+        self._fuente = fuente
+        self._componente = componente
+
+    def __getitem__(self, ciclo):
+        if ciclo not in self._fuente.ciclos:
+            raise KeyError(ciclo)
+        return self._fuente.obtener(ciclo)[self._componente]
+
+    def __iter__(self):
+        return iter(self._fuente.ciclos)
+
+    def __len__(self):
+        return len(self._fuente.ciclos)
@@ -0,0 +1,169 @@
+"""
+Recalculo incremental: compara el CSV con la última instantánea procesada por clase_id
+y reconstruye y reexporta solo lo que cambió
+"""
+import pickle
+
+import numpy as np
+
+import exportar
+from grilla import HorarioGrilla, TablaCursos, compactar_cursos
+from horario import DIAS, construir_dia, construir_horarios, preparar_clases
+from utils import FRANJAS
+
+# Subir la versión invalida las instantáneas escritas con un formato anterior
+VERSION_ESTADO = 2
+COLUMNAS_CLASE = ['ciclo', 'dia', 'primera', 'ultima', 'info']
+# La tabla de cursos de la instantánea solo crece: se rehace cuando esta fracción de
+# sus textos ya no aparece en ningún horario
+FRACCION_CURSOS_HUERFANOS = 0.5
+
+
+def directorio_estado():
+    """Instantánea de la última ejecución, junto a output/."""
+    return exportar.OUTPUT_DIR / ".incremental"
+
+
+def _leer_instantanea(dir_estado):
+    try:
+        with open(dir_estado / "instantanea.pkl", "rb") as f:
+            estado = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None
+    if estado.get("version") != VERSION_ESTADO:
+        return None
+    return estado
+
+
+def _guardar_instantanea(dir_estado, estado):
+    dir_estado.mkdir(parents=True, exist_ok=True)
+    tmp = dir_estado / "instantanea.pkl.tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump(estado, f, protocol=pickle.HIGHEST_PROTOCOL)
+    tmp.replace(dir_estado / "instantanea.pkl")
+
+
+def _clases_por_id(df, franjas):
+    clases = preparar_clases(df, franjas=franjas)
+    clases.index = df['clase_id'].to_numpy()
+    return clases
+
+
+def particiones_afectadas(anteriores, nuevas):
+    """
+    Compara dos tablas de clases indexadas por clase_id.
+    Retorna el conjunto de (ciclo, dia) donde se agregó, quitó o modificó alguna clase:
+    una clase que cambia de día o de ciclo afecta a la partición vieja y a la nueva.
+    """
+    comunes = anteriores.index.intersection(nuevas.index)
+    viejas = anteriores.loc[comunes, COLUMNAS_CLASE]
+    actuales = nuevas.loc[comunes, COLUMNAS_CLASE]
+    modificadas = comunes[(viejas.to_numpy() != actuales.to_numpy()).any(axis=1)]
+
+    quitadas = anteriores.index.difference(nuevas.index)
+    agregadas = nuevas.index.difference(anteriores.index)
+
+    afectadas = set()
+    for tabla, ids in ((anteriores, quitadas.append(modificadas)),
+                       (nuevas, agregadas.append(modificadas))):
+        filas = tabla.loc[ids]
+        afectadas.update(zip(filas['ciclo'].tolist(), filas['dia'].tolist()))
+    return afectadas
+
+
+def actualizar_horarios(df, ciclos=None, dir_estado=None, franjas=FRANJAS):
+    """
+    Construye los horarios reutilizando la última instantánea: solo se recalculan las
+    subcolumnas y colisiones de las particiones (ciclo, dia) que cambiaron.
+    Sin instantánea, si clase_id no es único o si cambió la grilla de franjas se
+    construye todo.
+
+    Retorna: (horarios_dict, max_colisiones_dict, franjas_activas_dict, cambios)
+    donde cambios = {ciclo: set(dias recalculados)}
+    """
+    dir_estado = dir_estado or directorio_estado()
+    clases = _clases_por_id(df, franjas)
+    if ciclos is None:
+        ciclos = sorted(clases['ciclo'].unique().tolist())
+    ciclos = list(ciclos)
+
+    estado = _leer_instantanea(dir_estado)
+    if (estado is None or estado["franjas"] != list(franjas)
+            or not (clases.index.is_unique and estado["clases"].index.is_unique)):
+        cursos = TablaCursos()
+        horarios, _, _ = construir_horarios(clases.reset_index(drop=True), ciclos, cursos,
+                                            franjas=franjas)
+        matrices = {ciclo: horarios[ciclo].matrices for ciclo in ciclos}
+        cambios = {ciclo: set(DIAS) for ciclo in ciclos}
+    else:
+        cursos = estado["cursos"]
+        matrices = {ciclo: dict(estado["matrices"][ciclo])
+                    for ciclo in ciclos if ciclo in estado["matrices"]}
+        cambios = {ciclo: set(DIAS) for ciclo in ciclos if ciclo not in matrices}
+        for ciclo, dia in particiones_afectadas(estado["clases"], clases):
+            if ciclo in matrices and dia in DIAS:
+                cambios.setdefault(ciclo, set()).add(dia)
+
+        validas = clases[clases['dia'].isin(DIAS) & (clases['primera'] < clases['ultima'])]
+        for ciclo, dias in cambios.items():
+            matrices.setdefault(ciclo, {})
+            for dia in dias:
+                filas = validas[(validas['ciclo'] == ciclo) & (validas['dia'] == dia)]
+                ids = np.array([cursos.id(info) for info in filas['info']], dtype=np.int32)
+                matrices[ciclo][dia] = construir_dia(filas['primera'].to_numpy(),
+                                                     filas['ultima'].to_numpy(), ids,
+                                                     franjas=franjas)
+
+        usados = len(np.unique(np.concatenate(
+            [matriz.ravel() for dias in matrices.values() for matriz in dias.values()]
+            + [np.zeros(1, dtype=np.int32)])))
+        if len(cursos) - usados > FRACCION_CURSOS_HUERFANOS * len(cursos):
+            compactadas, cursos = compactar_cursos(list(matrices.values()), cursos)
+            matrices = dict(zip(matrices, compactadas))
+
+    _guardar_instantanea(dir_estado, {
+        "version": VERSION_ESTADO,
+        "franjas": list(franjas),
+        "clases": clases[COLUMNAS_CLASE],
+        "cursos": cursos,
+        "matrices": matrices,
+    })
+
+    horarios_dict = {ciclo: HorarioGrilla(matrices[ciclo], cursos, franjas) for ciclo in ciclos}
+    max_colisiones_dict = {
+        ciclo: {dia: horarios_dict[ciclo][dia].num_subcolumnas for dia in DIAS}
+        for ciclo in ciclos
+    }
+    franjas_activas_dict = {ciclo: horarios_dict[ciclo].franjas_activas() for ciclo in ciclos}
+    return horarios_dict, max_colisiones_dict, franjas_activas_dict, cambios
+
+
+def exportar_cambios(horarios_dict, max_colisiones_dict, franjas_activas_dict,
+                     formatos=("excel", "pdf")):
+    """
+    Regenera solo los archivos cuyo contenido cambió, con la caché de exportación
+    (exportar.CacheExportacion): un Excel por ciclo y el PDF completo, que reutiliza
+    las páginas de los ciclos sin cambios.
+
+    Retorna la lista de archivos regenerados.
+    """
+    antes = exportar.CacheExportacion().archivos
+    if "excel" in formatos:
+        exportar.exportar_todos_excel(horarios_dict, max_colisiones_dict, franjas_activas_dict)
+    if "pdf" in formatos:
+        exportar.exportar_todos_pdf(horarios_dict, max_colisiones_dict, franjas_activas_dict)
+    despues = exportar.CacheExportacion().archivos
+
+    generados = [str(exportar.OUTPUT_DIR / clave) for clave, entrada in despues.items()
+                 if antes.get(clave) != entrada and not clave.startswith(exportar.DIR_CACHE)]
+    if not generados:
+        print("✅ Sin cambios: no se regeneró ningún archivo")
+    return generados
+
+
+def recalcular_incremental(df, ciclos=None, formatos=("excel", "pdf"), franjas=FRANJAS):
+    """Actualiza los horarios y reexporta solo lo que cambió desde la última ejecución."""
+    horarios, max_colisiones, franjas_activas, _ = actualizar_horarios(df, ciclos,
+                                                                       franjas=franjas)
+    generados = exportar_cambios(horarios, max_colisiones, franjas_activas, formatos)
+    return horarios, max_colisiones, franjas_activas, generados
@@ -0,0 +1,152 @@
+"""
+Ingesta del CSV de horarios por bloques, con validación y partición por ciclo
+"""
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from grilla import TablaCursos
+from horario import DIAS, construir_horarios, preparar_clases, quitar_acentos
+from utils import FRANJAS, MINUTO_INVALIDO
+
+TAM_BLOQUE = 50_000
+PATRON_HORA = r"\d{1,2}:\d{2}"
+
+
+def _normalizar_dias(dias):
+    if not isinstance(dias.dtype, pd.CategoricalDtype):
+        dias = dias.astype(str)
+        return dias.map({d: quitar_acentos(d.strip().upper()) for d in dias.unique()})
+    # Categórica: se normalizan las categorías, no cada fila. 'Miércoles' y 'MIERCOLES'
+    # pasan a ser la misma categoría; el código -1 (vacío) se conserva
+    nombres = pd.Index([quitar_acentos(str(d).strip().upper()) for d in dias.cat.categories])
+    categorias = nombres.unique()
+    codigos = np.append(categorias.get_indexer(nombres), -1)[dias.cat.codes.to_numpy()]
+    return pd.Series(pd.Categorical.from_codes(codigos, categorias), index=dias.index)
+
+
+def normalizar_bloque(bloque, descartadas=None):
+    """
+    Valida y normaliza un bloque del CSV:
+    - 'dia' sin espacios, en mayúsculas y sin acentos (MIÉRCOLES -> MIERCOLES)
+    - 'hora_inicio' / 'hora_fin' con formato H:MM o HH:MM, también como minutos
+    Las filas inválidas se descartan y se cuentan en `descartadas` {motivo: filas}.
+
+    Un DataFrame de cargar_csv ya trae 'minuto_inicio' / 'minuto_fin' (MINUTO_INVALIDO
+    para las horas inválidas) y el texto como categóricas: se valida con esas columnas,
+    sin volver a leer las horas, y se conservan los tipos.
+    """
+    bloque = bloque.copy(deep=False)
+    if bloque.empty:
+        # CSV con solo el encabezado: no hay horas que leer
+        for destino in ('minuto_inicio', 'minuto_fin'):
+            if destino not in bloque:
+                bloque[destino] = np.empty(0, dtype=np.int64)
+        return bloque
+    bloque['dia'] = _normalizar_dias(bloque['dia'])
+
+    validas = bloque['dia'].isin(DIAS)
+    motivos = [("día inválido", ~validas)]
+
+    en_cache = 'minuto_inicio' in bloque and 'minuto_fin' in bloque
+    for columna, destino in (('hora_inicio', 'minuto_inicio'), ('hora_fin', 'minuto_fin')):
+        if en_cache:
+            hora_ok = bloque[destino] != MINUTO_INVALIDO
+        else:
+            horas = bloque[columna].astype(str).str.strip()
+            formato_ok = horas.str.fullmatch(PATRON_HORA)
+            partes = horas.where(formato_ok, "0:00").str.split(":", n=1, expand=True).astype(int)
+            hora_ok = formato_ok & (partes[0] < 24) & (partes[1] < 60)
+            bloque[columna] = horas
+            bloque[destino] = partes[0] * 60 + partes[1]
+        motivos.append((f"{columna} inválida", validas & ~hora_ok))
+        validas &= hora_ok
+
+    rango_vacio = validas & (bloque['minuto_fin'] <= bloque['minuto_inicio'])
+    motivos.append(("hora_fin no posterior a hora_inicio", rango_vacio))
+    validas &= ~rango_vacio
+
+    if descartadas is not None:
+        for motivo, mascara in motivos:
+            cantidad = int(mascara.sum())
+            if cantidad:
+                descartadas[motivo] = descartadas.get(motivo, 0) + cantidad
+    return bloque if validas.all() else bloque[validas]
+
+
+def particiones_por_ciclo(ruta_csv, tam_bloque=TAM_BLOQUE, ordenado_por_ciclo=False,
+                          descartadas=None):
+    """
+    Lee el CSV en bloques de `tam_bloque` filas y entrega (ciclo, df_ciclo) por ciclo.
+
+    - ordenado_por_ciclo=True: el CSV viene agrupado por ciclo; cada ciclo se entrega
+      en cuanto aparece el siguiente, sin esperar al final del archivo.
+    - ordenado_por_ciclo=False: cada bloque se reparte en archivos temporales por ciclo
+      y los ciclos se entregan al terminar la lectura.
+
+    En ambos casos en memoria solo hay un bloque y, como mucho, un ciclo completo.
+    """
+    lector = pd.read_csv(ruta_csv, chunksize=tam_bloque, dtype={'dia': str,
+                                                                'hora_inicio': str,
+                                                                'hora_fin': str})
+    if ordenado_por_ciclo:
+        yield from _particiones_ordenadas(lector, descartadas)
+    else:
+        yield from _particiones_en_disco(lector, descartadas)
+
+
+def _particiones_ordenadas(lector, descartadas):
+    ciclo_actual, partes = None, []
+    for bloque in lector:
+        bloque = normalizar_bloque(bloque, descartadas)
+        for ciclo, parte in bloque.groupby('ciclo', sort=False):
+            if ciclo != ciclo_actual:
+                if partes:
+                    yield ciclo_actual, pd.concat(partes, ignore_index=True)
+                ciclo_actual, partes = ciclo, []
+            partes.append(parte)
+    if partes:
+        yield ciclo_actual, pd.concat(partes, ignore_index=True)
+
+
+def _particiones_en_disco(lector, descartadas):
+    tmp_dir = Path(tempfile.mkdtemp(prefix="particiones_"))
+    try:
+        piezas = {}  # ciclo -> [archivos]
+        for num_bloque, bloque in enumerate(lector):
+            bloque = normalizar_bloque(bloque, descartadas)
+            for ciclo, parte in bloque.groupby('ciclo', sort=False):
+                archivo = tmp_dir / f"ciclo_{ciclo}_{num_bloque:06d}.pkl"
+                parte.to_pickle(archivo)
+                piezas.setdefault(ciclo, []).append(archivo)
+
+        for ciclo in sorted(piezas):
+            partes = [pd.read_pickle(archivo) for archivo in piezas[ciclo]]
+            yield ciclo, pd.concat(partes, ignore_index=True)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def construir_en_flujo(ruta_csv, ciclos=None, franjas=FRANJAS, **opciones):
+    """
+    Construye cada ciclo en cuanto sus filas están completas, para exportarlo sin
+    esperar al resto, sobre la grilla `franjas`. Acepta las mismas opciones que
+    particiones_por_ciclo.
+
+    Genera: (ciclo, df_horario, max_colisiones_por_dia, franjas_activas)
+    """
+    descartadas = opciones.setdefault('descartadas', {})
+    cursos = TablaCursos()
+    for ciclo, df_ciclo in particiones_por_ciclo(ruta_csv, **opciones):
+        if ciclos is not None and ciclo not in ciclos:
+            continue
+        horarios, max_colisiones, franjas_activas = construir_horarios(
+            preparar_clases(df_ciclo, franjas=franjas), [ciclo], cursos, franjas=franjas)
+        yield ciclo, horarios[ciclo], max_colisiones[ciclo], franjas_activas[ciclo]
+
+    if descartadas:
+        detalle = ", ".join(f"{motivo}: {filas}" for motivo, filas in descartadas.items())
+        print(f"⚠️ Filas descartadas en la ingesta ({detalle})")
@@ -0,0 +1,232 @@
+"""
+Instrumentación liviana del pipeline: tiempos por etapa, contadores y perfiles opcionales
+
+Desactivada por defecto: etapa() devuelve un contexto vacío y medido()/contar() solo
+consultan una bandera. Se activa con activar() o con variables de entorno:
+
+    HORARIOS_PERFIL=1                  tiempos y contadores
+    HORARIOS_PERFIL=cprofile,memoria   además cProfile y pico de memoria (tracemalloc)
+    HORARIOS_TRAZA=traza.json          al terminar, guarda la traza JSON
+
+La traza usa el formato de Chrome (chrome://tracing, Perfetto). Las etapas que corren en
+los procesos de exportación en paralelo no se registran en el proceso principal.
+"""
+import atexit
+import cProfile
+import functools
+import io
+import json
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+
+_NULO = nullcontext()
+
+
+class Registro:
+    """Tiempos, contadores, eventos y perfiles acumulados del proceso."""
+
+    def __init__(self):
+        self.activo = False
+        self.perfilar = False
+        self.memoria = False
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.reiniciar()
+
+    def reiniciar(self):
+        with self._lock:
+            self.totales = {}  # etapa -> {llamadas, segundos, maximo, pico_mb}
+            self.contadores = {}
+            self.eventos = []
+            self.perfiles = {}  # etapa -> pstats.Stats
+            self._origen = time.perf_counter()
+
+    def pila(self):
+        """Etapas abiertas en el hilo actual."""
+        if not hasattr(self._local, "pila"):
+            self._local.pila = []
+        return self._local.pila
+
+
+REGISTRO = Registro()
+
+
+def activar(perfilar=False, memoria=False):
+    """Empieza a registrar. perfilar: cProfile por etapa; memoria: pico con tracemalloc."""
+    REGISTRO.perfilar = perfilar
+    REGISTRO.memoria = memoria
+    if memoria and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    REGISTRO.activo = True
+
+
+def desactivar():
+    REGISTRO.activo = False
+    if REGISTRO.memoria and tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+def etapa(nombre):
+    """Contexto que mide una etapa: `with etapa("pdf.build"): doc.build(...)`."""
+    if not REGISTRO.activo:
+        return _NULO
+    return _medir_etapa(nombre)
+
+
+def medido(nombre=None):
+    """Decorador equivalente a etapa(); por defecto la etapa es modulo.funcion."""
+    def decorador(funcion):
+        etiqueta = nombre or f"{funcion.__module__}.{funcion.__qualname__}"
+
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            if not REGISTRO.activo:
+                return funcion(*args, **kwargs)
+            with _medir_etapa(etiqueta):
+                return funcion(*args, **kwargs)
+        return envoltura
+    return decorador
+
+
+def contar(nombre, cantidad=1):
+    """Suma `cantidad` al contador `nombre` (filas, celdas, párrafos, ...)."""
+    if not REGISTRO.activo:
+        return
+    with REGISTRO._lock:
+        REGISTRO.contadores[nombre] = REGISTRO.contadores.get(nombre, 0) + cantidad
+
+
+@contextmanager
+def _medir_etapa(nombre):
+    pila = REGISTRO.pila()
+    marco = {"nombre": nombre, "pico": 0, "base": 0, "perfil": None}
+
+    # Un solo cProfile por hilo: una etapa anidada queda dentro del perfil de la exterior
+    if REGISTRO.perfilar and not any(abierto["perfil"] for abierto in pila):
+        marco["perfil"] = cProfile.Profile()
+    medir_memoria = REGISTRO.memoria and tracemalloc.is_tracing()
+    if medir_memoria:
+        actual, pico = tracemalloc.get_traced_memory()
+        if pila:
+            pila[-1]["pico"] = max(pila[-1]["pico"], pico)
+        tracemalloc.reset_peak()
+        marco["base"] = marco["pico"] = actual
+
+    pila.append(marco)
+    inicio = time.perf_counter()
+    if marco["perfil"]:
+        marco["perfil"].enable()
+    try:
+        yield
+    finally:
+        if marco["perfil"]:
+            marco["perfil"].disable()
+        fin = time.perf_counter()
+        pila.pop()
+        pico_mb = None
+        if medir_memoria:
+            pico = max(marco["pico"], tracemalloc.get_traced_memory()[1])
+            if pila:
+                pila[-1]["pico"] = max(pila[-1]["pico"], pico)
+            pico_mb = (pico - marco["base"]) / 2**20
+        _registrar(nombre, inicio, fin, pico_mb, pila[-1]["nombre"] if pila else None,
+                   marco["perfil"])
+
+
+def _registrar(nombre, inicio, fin, pico_mb, padre, perfil):
+    segundos = fin - inicio
+    with REGISTRO._lock:
+        total = REGISTRO.totales.setdefault(
+            nombre, {"llamadas": 0, "segundos": 0.0, "maximo": 0.0, "pico_mb": None})
+        total["llamadas"] += 1
+        total["segundos"] += segundos
+        total["maximo"] = max(total["maximo"], segundos)
+        if pico_mb is not None:
+            total["pico_mb"] = max(total["pico_mb"] or 0.0, pico_mb)
+
+        REGISTRO.eventos.append({
+            "name": nombre,
+            "ph": "X",
+            "ts": round((inicio - REGISTRO._origen) * 1e6, 1),
+            "dur": round(segundos * 1e6, 1),
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "args": {"padre": padre} if padre else {},
+        })
+        if perfil is not None:
+            if nombre in REGISTRO.perfiles:
+                REGISTRO.perfiles[nombre].add(perfil)
+            else:
+                REGISTRO.perfiles[nombre] = pstats.Stats(perfil)
+
+
+def resumen():
+    """Tabla de texto con las etapas (de mayor a menor tiempo total) y los contadores."""
+    with REGISTRO._lock:
+        totales = sorted(REGISTRO.totales.items(), key=lambda item: -item[1]["segundos"])
+        contadores = sorted(REGISTRO.contadores.items())
+
+    lineas = [f"{'etapa':<36} {'llamadas':>8} {'total (ms)':>11} {'media (ms)':>11} "
+              f"{'máx (ms)':>10} {'pico (MB)':>10}"]
+    for nombre, total in totales:
+        pico = f"{total['pico_mb']:.2f}" if total["pico_mb"] is not None else "-"
+        lineas.append(f"{nombre:<36} {total['llamadas']:>8} {total['segundos'] * 1000:>11.2f} "
+                      f"{total['segundos'] * 1000 / total['llamadas']:>11.2f} "
+                      f"{total['maximo'] * 1000:>10.2f} {pico:>10}")
+    if contadores:
+        lineas.append("")
+        lineas.extend(f"{nombre:<36} {valor:>8}" for nombre, valor in contadores)
+    return "\n".join(lineas)
+
+
+def _texto_perfil(estadisticas, limite=20):
+    salida = io.StringIO()
+    estadisticas.stream = salida
+    estadisticas.sort_stats("cumulative").print_stats(limite)
+    return salida.getvalue()
+
+
+def guardar_traza(ruta):
+    """Guarda eventos, totales, contadores y perfiles en JSON (formato de traza de Chrome)."""
+    with REGISTRO._lock:
+        traza = {
+            "traceEvents": list(REGISTRO.eventos),
+            "etapas": dict(REGISTRO.totales),
+            "contadores": dict(REGISTRO.contadores),
+            "perfiles": {nombre: _texto_perfil(estadisticas)
+                         for nombre, estadisticas in REGISTRO.perfiles.items()},
+        }
+    Path(ruta).write_text(json.dumps(traza, ensure_ascii=False, indent=1), encoding="utf-8")
+    return str(ruta)
+
+
+def informe(ruta_traza=None):
+    """Imprime el resumen, guarda la traza si se pide y vacía el registro."""
+    if not REGISTRO.totales and not REGISTRO.contadores:
+        return
+    print("\n" + resumen())
+    if ruta_traza:
+        print(f"🧭 Traza guardada en {guardar_traza(ruta_traza)}")
+    REGISTRO.reiniciar()
+
+
+def configurar_desde_entorno():
+    """Activa la instrumentación según HORARIOS_PERFIL / HORARIOS_TRAZA."""
+    opciones = {opcion.strip().lower()
+                for opcion in os.environ.get("HORARIOS_PERFIL", "").split(",") if opcion.strip()}
+    if not opciones or opciones == {"0"}:
+        return False
+    activar(perfilar="cprofile" in opciones, memoria="memoria" in opciones)
+    # Los procesos de exportación heredan el entorno: solo informa el proceso principal
+    import multiprocessing
+    if multiprocessing.parent_process() is None:
+        atexit.register(informe, os.environ.get("HORARIOS_TRAZA"))
+    return True
+
+
+configurar_desde_entorno()
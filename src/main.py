@@ -1,30 +1,42 @@
-import pandas as pd
-from horario import crear_horario_ciclo
+from cache_datos import cargar_csv
+from horario import HorariosDiferidos
+from ingesta import normalizar_bloque
+from paleta import PALETA
 from visualizacion import mostrar_horarios_navegables
 
-# Leer CSV
-df = pd.read_csv("data/horario_final.csv")
 
-# Ciclos que quieres mostrar
-ciclos = [1, 2, 4, 6, 8, 10]
+def main():
+    # Leer CSV (desde la caché columnar si el archivo no cambió)
+    df = cargar_csv("data/horario_final.csv")
+    # Descartar filas con día u horas inválidos, avisando cuántas
+    descartadas = {}
+    df = normalizar_bloque(df, descartadas)
+    for motivo, filas in descartadas.items():
+        print(f"⚠️ {filas} fila(s) descartada(s): {motivo}")
 
-# Generar horarios
-horarios_dict = {}
-max_colisiones_dict = {}
-franjas_activas_dict = {}
+    # Ciclos que quieres mostrar
+    ciclos = [1, 2, 4, 6, 8, 10]
 
-for ciclo in ciclos:
-    df_horario, max_colisiones, franjas_activas = crear_horario_ciclo(df, ciclo)
-    horarios_dict[ciclo] = df_horario
-    max_colisiones_dict[ciclo] = max_colisiones
-    franjas_activas_dict[ciclo] = franjas_activas
+    # Los horarios se construyen bajo demanda: al abrir solo el primer ciclo visible,
+    # y los vecinos en segundo plano mientras se navega
+    horarios = HorariosDiferidos(df, ciclos)
 
-print("=" * 60)
-print("VISUALIZADOR DE HORARIOS ACADÉMICOS")
-print("=" * 60)
-print(f"✓ {len(ciclos)} horarios cargados correctamente")
-print("\nAbriendo interfaz gráfica...")
+    # Colores de todas las asignaturas, calculados una sola vez
+    PALETA.precalcular(df['asignatura_nombre'].unique())
 
-# Mostrar en ventana interactiva
-mostrar_horarios_navegables(horarios_dict, max_colisiones_dict, franjas_activas_dict)
-print("\n✓ Ventana cerrada. Programa finalizado.")
\ No newline at end of file
+    print("=" * 60)
+    print("VISUALIZADOR DE HORARIOS ACADÉMICOS")
+    print("=" * 60)
+    print(f"✓ {len(ciclos)} ciclos disponibles")
+    print("\nAbriendo interfaz gráfica...")
+
+    # Mostrar en ventana interactiva
+    mostrar_horarios_navegables(horarios.horarios, horarios.max_colisiones,
+                                horarios.franjas_activas)
+    print("\n✓ Ventana cerrada. Programa finalizado.")
+
+
+# Protección necesaria para que los procesos de exportación en paralelo
+# no vuelvan a abrir la interfaz al importar este módulo
+if __name__ == "__main__":
+    main()
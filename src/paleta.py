@@ -0,0 +1,66 @@
+"""
+Paleta de colores pastel por asignatura, compartida por la interfaz y los exportadores
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+def color_md5(texto):
+    """Color pastel determinístico (RGB en 140-220) a partir del MD5 del texto."""
+    hash_obj = hashlib.md5(texto.encode())
+    hash_hex = hash_obj.hexdigest()
+    r = min(220, max(140, int(int(hash_hex[0:2], 16) * 0.5 + 100)))
+    g = min(220, max(140, int(int(hash_hex[2:4], 16) * 0.5 + 100)))
+    b = min(220, max(140, int(int(hash_hex[4:6], 16) * 0.5 + 100)))
+    return f"{r:02x}{g:02x}{b:02x}"
+
+
+class PaletaColores:
+    """
+    Caché LRU acotada {asignatura: color hex}.
+    Es segura entre hilos para que la interfaz y las exportaciones en segundo plano la compartan.
+    """
+
+    def __init__(self, max_colores=4096):
+        self.max_colores = max_colores
+        self._colores = OrderedDict()
+        self._lock = threading.Lock()
+
+    def color(self, asignatura):
+        with self._lock:
+            color = self._colores.get(asignatura)
+            if color is not None:
+                self._colores.move_to_end(asignatura)
+                return color
+        color = color_md5(asignatura)
+        self._guardar_en_cache(asignatura, color)
+        return color
+
+    def _guardar_en_cache(self, asignatura, color):
+        with self._lock:
+            self._colores[asignatura] = color
+            self._colores.move_to_end(asignatura)
+            while len(self._colores) > self.max_colores:
+                self._colores.popitem(last=False)
+
+    def precalcular(self, asignaturas):
+        """Calcula de una vez el color de todas las asignaturas del dataset."""
+        for asignatura in asignaturas:
+            self.color(str(asignatura).strip())
+
+    def __len__(self):
+        return len(self._colores)
+
+
+# Paleta única del proceso
+PALETA = PaletaColores()
+
+
+def generar_color_pastel(texto):
+    return PALETA.color(texto)
+
+
+def color_curso(valor):
+    """Color de una celda 'ASIGNATURA - profesor - grupo - aula', según su asignatura."""
+    return PALETA.color(valor.split(' - ')[0].strip())
@@ -1,30 +1,146 @@
-from datetime import datetime, timedelta
+from collections.abc import Sequence
+
+import numpy as np
+
+def minutos_a_hora(minutos):
+    return f"{minutos // 60:02d}:{minutos % 60:02d}"
+
+def hora_a_minutos(hora_str):
+    """Convierte 'HH:MM' (o 'H:MM') en minutos desde medianoche."""
+    horas, minutos = hora_str.strip().split(":")
+    return int(horas) * 60 + int(minutos)
+
+MINUTOS_DIA = 24 * 60
+# Minuto de una hora inválida en columnas ya convertidas (caché columnar)
+MINUTO_INVALIDO = -1
+
+class GrillaFranjas(Sequence):
+    """
+    Franjas de la jornada, configurables por conjunto de datos: 'HH:MM - HH:MM' desde
+    `inicio` hasta `fin` cada `duracion` minutos, saltando los `recesos`
+    [("13:00", "13:45"), ...]. Una franja que alcanza un receso se corta donde este
+    empieza ("12:30 - 13:00") y la siguiente empieza cuando termina.
+    
+    Se usa como la lista de etiquetas (franjas[i], len, for, slicing). Guarda además dos
+    tablas minuto → franja, así que ubicar una clase cuesta O(1) con cualquier granularidad.
+    Una clase que cae entera en un receso o fuera de la jornada no ocupa ninguna franja.
+    """
+
+    def __init__(self, inicio="08:00", fin="22:15", duracion=45, recesos=()):
+        if duracion <= 0:
+            raise ValueError(f"La duración de las franjas debe ser positiva: {duracion}")
+        self.inicio, self.fin = hora_a_minutos(inicio), hora_a_minutos(fin)
+        self.duracion = int(duracion)
+        self.recesos = tuple(sorted((hora_a_minutos(desde), hora_a_minutos(hasta))
+                                    for desde, hasta in recesos))
+        
+        self.inicios, self.fines = [], []
+        minuto = self.inicio
+        while minuto < self.fin:
+            fin_franja = minuto + self.duracion
+            receso = next(((desde, hasta) for desde, hasta in self.recesos
+                           if desde < fin_franja and hasta > minuto), None)
+            if receso is not None:
+                desde, hasta = receso
+                fin_franja = desde
+            if fin_franja > minuto:
+                self.inicios.append(minuto)
+                self.fines.append(fin_franja)
+            minuto = hasta if receso is not None else fin_franja
+        self.etiquetas = [f"{minutos_a_hora(desde)} - {minutos_a_hora(hasta)}"
+                          for desde, hasta in zip(self.inicios, self.fines)]
+        
+        self._tablas()
+
+    def _tablas(self):
+        # Una clase que empieza en el minuto m ocupa desde la primera franja que termina
+        # después de m; una que termina en m, hasta la última que empieza antes de m
+        minutos = np.arange(MINUTOS_DIA + 1)
+        self._primera = np.searchsorted(self.fines, minutos, side="right")
+        self._ultima = np.searchsorted(self.inicios, minutos, side="left")
+
+    def __getstate__(self):
+        # Las tablas se recalculan al deserializar: los procesos de exportación
+        # reciben la grilla con cada horario
+        return {clave: valor for clave, valor in self.__dict__.items()
+                if clave not in ("_primera", "_ultima")}
+
+    def __setstate__(self, estado):
+        self.__dict__.update(estado)
+        self._tablas()
+
+    def rango(self, inicio, fin):
+        """Índices [primera, ultima) de las franjas que se solapan con [inicio, fin) en minutos."""
+        primera = int(self._primera[min(max(inicio, 0), MINUTOS_DIA)])
+        ultima = int(self._ultima[min(max(fin, 0), MINUTOS_DIA)])
+        return primera, max(primera, ultima)
+
+    def rangos(self, inicios, fines):
+        """Versión vectorizada de rango para arrays de minutos."""
+        primeras = self._primera[np.clip(inicios, 0, MINUTOS_DIA)]
+        ultimas = self._ultima[np.clip(fines, 0, MINUTOS_DIA)]
+        return primeras, np.maximum(primeras, ultimas)
+
+    def __getitem__(self, indice):
+        return self.etiquetas[indice]
+
+    def __len__(self):
+        return len(self.etiquetas)
+
+    def __repr__(self):
+        recesos = ", ".join(f"{minutos_a_hora(desde)}-{minutos_a_hora(hasta)}"
+                            for desde, hasta in self.recesos)
+        return (f"GrillaFranjas({minutos_a_hora(self.inicio)}-{minutos_a_hora(self.fin)}, "
+                f"{self.duracion} min{', recesos ' + recesos if recesos else ''})")
+
+FRANJAS = GrillaFranjas()
 
-# Generar franjas dinámicas desde min_hora hasta max_hora
 def generar_franjas(min_hora="08:00", max_hora="22:15", duracion_min=45):
-    franjas = []
-    inicio = datetime.strptime(min_hora, "%H:%M")
-    fin = datetime.strptime(max_hora, "%H:%M")
-
-    while inicio < fin:
-        fin_franja = inicio + timedelta(minutes=duracion_min)
-        franjas.append(f"{inicio.strftime('%H:%M')} - {fin_franja.strftime('%H:%M')}")
-        inicio = fin_franja
-    return franjas
-
-FRANJAS = generar_franjas()
-
-def str_a_hora(hora_str):
-    return datetime.strptime(hora_str, "%H:%M")
-
-def franjas_ocupadas(hora_inicio, hora_fin):
-    inicio = str_a_hora(hora_inicio)
-    fin = str_a_hora(hora_fin)
-    franjas = []
-    for franja in FRANJAS:
-        f_inicio, f_fin = franja.split(" - ")
-        f_inicio_dt = str_a_hora(f_inicio)
-        f_fin_dt = str_a_hora(f_fin)
-        if (inicio < f_fin_dt) and (fin > f_inicio_dt):
-            franjas.append(franja)
-    return franjas
+    """Etiquetas 'HH:MM - HH:MM' de una GrillaFranjas sin recesos."""
+    return list(GrillaFranjas(min_hora, max_hora, duracion_min).etiquetas)
+
+def franjas_contiguas(franjas):
+    """
+    contiguas[i] es True si la franja i + 1 empieza donde termina la i. Entre franjas
+    activas no consecutivas (o separadas por un receso) hay tiempo sin mostrar.
+    """
+    limites = [franja.split(" - ") for franja in franjas]
+    return [fin == siguiente[0] for (_, fin), siguiente in zip(limites, limites[1:])]
+
+def escala_franjas(df_horario):
+    """Duración de las franjas del horario relativa a las de FRANJAS (para altos de fila)."""
+    franjas = getattr(df_horario, 'franjas', FRANJAS)
+    return getattr(franjas, 'duracion', FRANJAS.duracion) / FRANJAS.duracion
+
+def rango_franjas(hora_inicio, hora_fin, franjas=FRANJAS):
+    """
+    Índices [primera, ultima) de las franjas que se solapan con la clase.
+    Una franja se ocupa si inicio < fin_franja y fin > inicio_franja.
+    """
+    return franjas.rango(hora_a_minutos(hora_inicio), hora_a_minutos(hora_fin))
+
+def minutos_columna(serie, invalido=None):
+    """
+    Convierte una columna de horas 'HH:MM' en un array de minutos.
+    Con `invalido` (p. ej. MINUTO_INVALIDO) las horas mal escritas, vacías o fuera de
+    rango toman ese valor en lugar de lanzar ValueError.
+    """
+    if len(serie) == 0:
+        return np.empty(0, dtype=np.int64)
+    if invalido is None:
+        partes = serie.astype(str).str.strip().str.split(":", n=1, expand=True)
+        return (partes[0].astype(int) * 60 + partes[1].astype(int)).to_numpy()
+    partes = serie.astype(str).str.strip().str.extract(r"^(\d{1,2}):(\d{2})$").astype(float)
+    validas = (partes[0] < 24) & (partes[1] < 60)
+    return (partes[0] * 60 + partes[1]).where(validas, invalido).to_numpy(dtype=np.int64)
+
+def rangos_franjas(serie_inicio, serie_fin, franjas=FRANJAS):
+    """
+    Versión vectorizada de rango_franjas para columnas completas de un DataFrame.
+    Retorna: (primeras, ultimas) como arrays de índices de franja.
+    """
+    return franjas.rangos(minutos_columna(serie_inicio), minutos_columna(serie_fin))
+
+def franjas_ocupadas(hora_inicio, hora_fin, franjas=FRANJAS):
+    primera, ultima = rango_franjas(hora_inicio, hora_fin, franjas)
+    return franjas[primera:ultima]
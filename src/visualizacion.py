@@ -1,13 +1,232 @@
 """
 Módulo de visualización de horarios con interfaz gráfica Tkinter
 """
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+import queue
+import threading
 import tkinter as tk
-from tkinter import messagebox
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from tkinter import ttk
 
-from anyio import Path
-from exportar import (generar_color_pastel, exportar_a_pdf, exportar_todos_pdf,
+from exportar import (ExportacionCancelada, exportar_a_pdf, exportar_todos_pdf,
                      exportar_horario_excel, exportar_todos_excel)
+from instrumentacion import contar, medido
+from paleta import color_curso
 from horario import DIAS
+from utils import escala_franjas, franjas_contiguas
+
+
+# Medidas de la grilla en píxeles
+ANCHO_FRANJA = 120
+ANCHO_SUBCOLUMNA = 300
+ALTO_ENCABEZADO = 30
+# Alto de una fila con franjas de 45 minutos; escala con la duración de la grilla
+ALTO_FILA = 70
+ALTO_FILA_MINIMO = 24
+# Margen dibujado alrededor de la zona visible para que el scroll no muestre huecos
+MARGEN_VISTA = 150
+# Ciclos dibujados que se mantienen en memoria para volver a ellos al instante
+MAX_CICLOS_RENDERIZADOS = 4
+
+FUENTE_ENCABEZADO = ('Arial', 10, 'bold')
+FUENTE_FRANJA = ('Arial', 8, 'bold')
+FUENTE_CURSO = ('Arial', 7)
+
+
+class GrillaCanvas:
+    """
+    Dibuja un horario en un Canvas con rectángulos y textos, solo en la zona visible.
+    Las franjas consecutivas de un mismo curso se dibujan como un único bloque.
+    Los items del Canvas se reutilizan entre ciclos y al hacer scroll: se reubican u
+    ocultan, nunca se destruyen.
+    """
+
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self._items = []          # [(rectangulo, texto)] reutilizables
+        self._columnas_x = [0]    # x inicial de cada columna y ancho total al final
+        self._encabezados = []    # celdas de la fila 0
+        self._celdas = []         # por columna: celdas ordenadas por y
+        self._fines_y = []        # por columna: y final de cada celda (para bisect)
+        self._pendiente = False
+
+    @medido("tk.cargar")
+    def cargar(self, df_horario, max_colisiones, franjas_activas):
+        """Calcula la disposición del ciclo y dibuja la zona visible."""
+        alto_fila = max(ALTO_FILA_MINIMO, round(ALTO_FILA * escala_franjas(df_horario)))
+        columnas_x = [0, ANCHO_FRANJA]
+        self._encabezados = [(0, 0, ANCHO_FRANJA, ALTO_ENCABEZADO, '#2F5496', "HORARIO",
+                              FUENTE_ENCABEZADO, 'white', True)]
+        
+        # Columna 0: franjas horarias
+        columna = []
+        for i, franja in enumerate(franjas_activas):
+            y0 = ALTO_ENCABEZADO + i * alto_fila
+            columna.append((0, y0, ANCHO_FRANJA, y0 + alto_fila, '#D0CECE', franja,
+                            FUENTE_FRANJA, 'black', True))
+        celdas = [columna]
+        contiguas = franjas_contiguas(franjas_activas)
+        
+        for dia in DIAS:
+            num_subcols = max_colisiones[dia]
+            if num_subcols == 0:
+                continue
+            x_dia = columnas_x[-1]
+            self._encabezados.append((x_dia, 0, x_dia + num_subcols * ANCHO_SUBCOLUMNA,
+                                      ALTO_ENCABEZADO, '#2F5496', dia,
+                                      FUENTE_ENCABEZADO, 'white', True))
+            filas = [df_horario[dia][franja] for franja in franjas_activas]
+            for idx_sub in range(num_subcols):
+                x0 = columnas_x[-1]
+                x1 = x0 + ANCHO_SUBCOLUMNA
+                columnas_x.append(x1)
+                valores = [cursos[idx_sub] if idx_sub < len(cursos) else "" for cursos in filas]
+                celdas.append(self._bloques_columna(valores, contiguas, x0, x1, alto_fila))
+        
+        self._columnas_x = columnas_x
+        self._celdas = celdas
+        self._fines_y = [[celda[3] for celda in columna] for columna in celdas]
+        
+        alto_total = ALTO_ENCABEZADO + len(franjas_activas) * alto_fila
+        self.canvas.configure(scrollregion=(0, 0, columnas_x[-1], alto_total))
+        self.renderizar()
+
+    @staticmethod
+    def _bloques_columna(valores, contiguas, x0, x1, alto_fila):
+        """Une las franjas consecutivas y contiguas en el tiempo de un mismo curso en un bloque."""
+        bloques = []
+        inicio = 0
+        while inicio < len(valores):
+            valor = valores[inicio]
+            fin = inicio + 1
+            while (fin < len(valores) and valor and valores[fin] == valor
+                   and contiguas[fin - 1]):
+                fin += 1
+            y0 = ALTO_ENCABEZADO + inicio * alto_fila
+            y1 = ALTO_ENCABEZADO + fin * alto_fila
+            fondo = f"#{color_curso(str(valor))}" if valor and str(valor).strip() else 'white'
+            bloques.append((x0, y0, x1, y1, fondo, valor, FUENTE_CURSO, 'black', False))
+            inicio = fin
+        return bloques
+
+    def programar_renderizado(self, *args):
+        """Agrupa varios eventos de scroll o redimensionado en un solo renderizado."""
+        if not self._pendiente:
+            self._pendiente = True
+            self.canvas.after_idle(self.renderizar)
+
+    def _celdas_visibles(self):
+        izquierda = self.canvas.canvasx(0) - MARGEN_VISTA
+        derecha = self.canvas.canvasx(self.canvas.winfo_width()) + MARGEN_VISTA
+        arriba = self.canvas.canvasy(0) - MARGEN_VISTA
+        abajo = self.canvas.canvasy(self.canvas.winfo_height()) + MARGEN_VISTA
+        
+        visibles = [celda for celda in self._encabezados
+                    if celda[0] < derecha and celda[2] > izquierda]
+        
+        primera_col = max(0, bisect_right(self._columnas_x, izquierda) - 1)
+        ultima_col = min(len(self._celdas), bisect_left(self._columnas_x, derecha))
+        for idx_col in range(primera_col, ultima_col):
+            columna = self._celdas[idx_col]
+            i = bisect_right(self._fines_y[idx_col], arriba)
+            while i < len(columna) and columna[i][1] < abajo:
+                visibles.append(columna[i])
+                i += 1
+        return visibles
+
+    @medido("tk.renderizar")
+    def renderizar(self):
+        self._pendiente = False
+        canvas = self.canvas
+        visibles = self._celdas_visibles()
+        contar("tk.celdas_dibujadas", len(visibles))
+        
+        for idx, (x0, y0, x1, y1, fondo, texto, fuente, color, centrado) in enumerate(visibles):
+            if idx == len(self._items):
+                self._items.append((canvas.create_rectangle(0, 0, 0, 0, outline='black'),
+                                    canvas.create_text(0, 0)))
+            rectangulo, item_texto = self._items[idx]
+            canvas.coords(rectangulo, x0, y0, x1, y1)
+            canvas.itemconfigure(rectangulo, fill=fondo, state='normal')
+            if centrado:
+                canvas.coords(item_texto, (x0 + x1) / 2, (y0 + y1) / 2)
+                canvas.itemconfigure(item_texto, anchor='center', justify='center')
+            else:
+                canvas.coords(item_texto, x0 + 5, y0 + 5)
+                canvas.itemconfigure(item_texto, anchor='nw', justify='left')
+            canvas.itemconfigure(item_texto, text=texto, font=fuente, fill=color,
+                                 width=x1 - x0 - 10, state='normal')
+        
+        # Los items sobrantes se ocultan para reutilizarlos después
+        for rectangulo, item_texto in self._items[len(visibles):]:
+            canvas.itemconfigure(rectangulo, state='hidden')
+            canvas.itemconfigure(item_texto, state='hidden')
+
+
+class CacheRenderizado:
+    """
+    LRU acotada de ciclos ya dibujados. Cada ciclo se dibuja en su propio Frame (con una
+    GrillaCanvas), todos apilados en la misma celda: mostrar un ciclo en caché es un tkraise.
+    Con la caché llena se reutiliza el Frame del ciclo menos usado que no esté a la vista.
+    """
+
+    def __init__(self, contenedor, scrollbar_v, scrollbar_h, max_ciclos=MAX_CICLOS_RENDERIZADOS):
+        self.contenedor = contenedor
+        self.scrollbar_v = scrollbar_v
+        self.scrollbar_h = scrollbar_h
+        self.max_ciclos = max(2, max_ciclos)
+        self.activa = None
+        self._grillas = OrderedDict()  # ciclo -> (frame, grilla)
+        contenedor.rowconfigure(0, weight=1)
+        contenedor.columnconfigure(0, weight=1)
+
+    def _nueva_grilla(self):
+        frame = tk.Frame(self.contenedor, bg='white')
+        frame.grid(row=0, column=0, sticky='nsew')
+        canvas = tk.Canvas(frame, bg='white', highlightthickness=0)
+        canvas.pack(fill=tk.BOTH, expand=True)
+        grilla = GrillaCanvas(canvas)
+        
+        # Solo la grilla a la vista mueve las barras de desplazamiento
+        def desplazar(scrollbar, *args):
+            if grilla is self.activa:
+                scrollbar.set(*args)
+            grilla.programar_renderizado()
+        
+        canvas.configure(yscrollcommand=lambda *args: desplazar(self.scrollbar_v, *args),
+                         xscrollcommand=lambda *args: desplazar(self.scrollbar_h, *args))
+        canvas.bind("<Configure>", grilla.programar_renderizado)
+        return frame, grilla
+
+    def contiene(self, ciclo):
+        return ciclo in self._grillas
+
+    def preparar(self, ciclo, df_horario, max_colisiones, franjas_activas):
+        """Dibuja el ciclo en un Frame oculto, si no estaba ya en la caché."""
+        if ciclo in self._grillas:
+            self._grillas.move_to_end(ciclo)
+            return self._grillas[ciclo]
+        
+        if len(self._grillas) < self.max_ciclos:
+            entrada = self._nueva_grilla()
+        else:
+            victima = next(c for c, (_, g) in self._grillas.items() if g is not self.activa)
+            entrada = self._grillas.pop(victima)
+        
+        entrada[1].cargar(df_horario, max_colisiones, franjas_activas)
+        self._grillas[ciclo] = entrada
+        return entrada
+
+    def mostrar(self, ciclo, df_horario, max_colisiones, franjas_activas):
+        frame, grilla = self.preparar(ciclo, df_horario, max_colisiones, franjas_activas)
+        frame.tkraise()
+        self.activa = grilla
+        self.scrollbar_v.config(command=grilla.canvas.yview)
+        self.scrollbar_h.config(command=grilla.canvas.xview)
+        self.scrollbar_v.set(*grilla.canvas.yview())
+        self.scrollbar_h.set(*grilla.canvas.xview())
 
 
 def mostrar_horarios_navegables(horarios_dict, max_colisiones_dict, franjas_activas_dict):
@@ -37,127 +256,66 @@ def mostrar_horarios_navegables(horarios_dict, max_colisiones_dict, franjas_acti
     table_frame = tk.Frame(root, bg='white')
     table_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
     
-    canvas = tk.Canvas(table_frame, bg='white')
-    scrollbar_v = tk.Scrollbar(table_frame, orient='vertical', command=canvas.yview)
-    scrollbar_h = tk.Scrollbar(table_frame, orient='horizontal', command=canvas.xview)
+    scrollbar_v = tk.Scrollbar(table_frame, orient='vertical')
+    scrollbar_h = tk.Scrollbar(table_frame, orient='horizontal')
+    pila = tk.Frame(table_frame, bg='white')
+    cache = CacheRenderizado(pila, scrollbar_v, scrollbar_h)
     
-    scrollable_frame = tk.Frame(canvas, bg='white')
+    scrollbar_v.pack(side=tk.RIGHT, fill=tk.Y)
+    scrollbar_h.pack(side=tk.BOTTOM, fill=tk.X)
+    pila.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
     
-    scrollable_frame.bind(
-        "<Configure>",
-        lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
-    )
+    def datos_ciclo(ciclo):
+        return horarios_dict[ciclo], max_colisiones_dict[ciclo], franjas_activas_dict[ciclo]
     
-    canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
-    canvas.configure(yscrollcommand=scrollbar_v.set, xscrollcommand=scrollbar_h.set)
+    # Precarga: los ciclos vecinos se construyen en un hilo y se dibujan (ocultos) en
+    # el hilo de Tk al revisar `cola_precarga`
+    precargador = ThreadPoolExecutor(max_workers=1, thread_name_prefix="precarga")
+    cola_precarga = queue.Queue()
+    en_precarga = set()
+    revisando_precarga = [False]
     
-    scrollbar_v.pack(side=tk.RIGHT, fill=tk.Y)
-    scrollbar_h.pack(side=tk.BOTTOM, fill=tk.X)
-    canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+    def construir_en_segundo_plano(ciclo):
+        try:
+            cola_precarga.put((ciclo, datos_ciclo(ciclo)))
+        except Exception as e:
+            print(f"⚠️ No se pudo precargar el ciclo {ciclo}: {e}")
+            cola_precarga.put((ciclo, None))
     
-    def limpiar_tabla():
-        for widget in scrollable_frame.winfo_children():
-            widget.destroy()
+    def precargar_vecinos():
+        for vecino in (idx_actual[0] + 1, idx_actual[0] - 1):
+            if 0 <= vecino < len(ciclos):
+                ciclo = ciclos[vecino]
+                if not cache.contiene(ciclo) and ciclo not in en_precarga:
+                    en_precarga.add(ciclo)
+                    precargador.submit(construir_en_segundo_plano, ciclo)
+        if en_precarga and not revisando_precarga[0]:
+            revisando_precarga[0] = True
+            root.after(50, revisar_precarga)
+    
+    def revisar_precarga():
+        while True:
+            try:
+                ciclo, datos = cola_precarga.get_nowait()
+            except queue.Empty:
+                break
+            en_precarga.discard(ciclo)
+            if datos is not None and not cache.contiene(ciclo):
+                cache.preparar(ciclo, *datos)
+        if en_precarga:
+            root.after(50, revisar_precarga)
+        else:
+            revisando_precarga[0] = False
     
     def dibujar_horario():
-        limpiar_tabla()
-        
         ciclo = ciclos[idx_actual[0]]
-        df_horario = horarios_dict[ciclo]
-        max_colisiones = max_colisiones_dict[ciclo]
-        franjas_activas = franjas_activas_dict[ciclo]
         
         info_label.config(
             text=f"CICLO {ciclo} - Horario Académico ({idx_actual[0]+1}/{len(ciclos)})"
         )
         
-        colores_asignaturas = {}
-        
-        style_config = {
-            'borderwidth': 1,
-            'relief': 'solid',
-            'padx': 5,
-            'pady': 5
-        }
-        
-        # Columna 0: Horarios
-        col_actual = 0
-        
-        header_cell = tk.Label(
-            scrollable_frame,
-            text="HORARIO",
-            bg='#2F5496',
-            fg='white',
-            font=('Arial', 10, 'bold'),
-            **style_config
-        )
-        header_cell.grid(row=0, column=col_actual, sticky='nsew')
-        scrollable_frame.columnconfigure(col_actual, minsize=120)
-        col_actual += 1
-        
-        # Encabezados de días
-        for dia in DIAS:
-            num_subcols = max_colisiones[dia]
-            
-            header_cell = tk.Label(
-                scrollable_frame,
-                text=dia,
-                bg='#2F5496',
-                fg='white',
-                font=('Arial', 10, 'bold'),
-                **style_config
-            )
-            header_cell.grid(row=0, column=col_actual, columnspan=num_subcols, sticky='nsew')
-            
-            for sub_idx in range(num_subcols):
-                scrollable_frame.columnconfigure(col_actual + sub_idx, minsize=300, weight=1)
-            
-            col_actual += num_subcols
-        
-        # Filas de datos
-        for i, franja in enumerate(franjas_activas):
-            time_cell = tk.Label(
-                scrollable_frame,
-                text=franja,
-                bg='#D0CECE',
-                font=('Arial', 8, 'bold'),
-                **style_config
-            )
-            time_cell.grid(row=i+1, column=0, sticky='nsew')
-            scrollable_frame.rowconfigure(i+1, minsize=70)
-            
-            col_actual = 1
-            for dia in DIAS:
-                cursos = df_horario[dia][franja]
-                num_subcols = max_colisiones[dia]
-                
-                while len(cursos) < num_subcols:
-                    cursos.append("")
-                
-                for idx_sub in range(num_subcols):
-                    valor = cursos[idx_sub] if idx_sub < len(cursos) else ""
-                    
-                    if valor and str(valor).strip() != "":
-                        asignatura = str(valor).split(' - ')[0].strip()
-                        
-                        if asignatura not in colores_asignaturas:
-                            colores_asignaturas[asignatura] = f"#{generar_color_pastel(asignatura)}"
-                        
-                        bg_color = colores_asignaturas[asignatura]
-                    else:
-                        bg_color = 'white'
-                    
-                    data_cell = tk.Label(
-                        scrollable_frame,
-                        text=valor,
-                        bg=bg_color,
-                        font=('Arial', 7),
-                        wraplength=280,
-                        justify='left',
-                        **style_config
-                    )
-                    data_cell.grid(row=i+1, column=col_actual, sticky='nsew')
-                    col_actual += 1
+        cache.mostrar(ciclo, *datos_ciclo(ciclo))
+        precargar_vecinos()
     
     def siguiente():
         if idx_actual[0] < len(ciclos) - 1:
@@ -169,31 +327,118 @@ def mostrar_horarios_navegables(horarios_dict, max_colisiones_dict, franjas_acti
             idx_actual[0] -= 1
             dibujar_horario()
     
+    # Exportación en segundo plano: el hilo exportador solo escribe en `cola` y el hilo
+    # de Tk la revisa con root.after, así el mainloop nunca se bloquea
+    ejecutor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="exportacion")
+    cola = queue.Queue()
+    cancelar = threading.Event()
+    exportando = [False]
+    
+    def lanzar_exportacion(descripcion, tarea, mensaje_exito, cancelable=True):
+        """
+        Ejecuta tarea(progreso) en el hilo exportador.
+        mensaje_exito(resultado) arma el texto de la notificación final.
+        Con cancelable=False (un solo archivo, sin llamadas a progreso) el botón
+        Cancelar queda deshabilitado.
+        """
+        if exportando[0]:
+            notificar("⏳ Ya hay una exportación en curso", '#B9770E')
+            return
+        exportando[0] = True
+        cancelar.clear()
+        barra_progreso.configure(mode='indeterminate', value=0)
+        barra_progreso.start(15)
+        btn_cancelar.config(state=tk.NORMAL if cancelable else tk.DISABLED)
+        notificar(f"⏳ {descripcion}...", '#2F5496')
+        
+        def progreso(hechos, total, ciclo):
+            if cancelar.is_set():
+                raise ExportacionCancelada()
+            cola.put(('progreso', hechos, total))
+        
+        def ejecutar():
+            try:
+                resultado = tarea(progreso)
+                cola.put(('fin', mensaje_exito(resultado)))
+            except ExportacionCancelada:
+                cola.put(('cancelado', f"✖ {descripcion}: cancelada"))
+            except Exception as e:
+                cola.put(('error', f"❌ {descripcion}: {e}"))
+        
+        ejecutor.submit(ejecutar)
+        root.after(100, revisar_cola)
+    
+    def revisar_cola():
+        while True:
+            try:
+                mensaje = cola.get_nowait()
+            except queue.Empty:
+                break
+            tipo = mensaje[0]
+            if tipo == 'progreso':
+                _, hechos, total = mensaje
+                barra_progreso.stop()
+                barra_progreso.configure(mode='determinate', maximum=total, value=hechos)
+            else:
+                exportando[0] = False
+                barra_progreso.stop()
+                barra_progreso.configure(mode='determinate', value=0)
+                btn_cancelar.config(state=tk.DISABLED)
+                color = {'fin': '#1E8449', 'cancelado': '#B9770E', 'error': '#C0392B'}[tipo]
+                notificar(mensaje[1], color)
+        if exportando[0]:
+            root.after(100, revisar_cola)
+    
+    def notificar(texto, color):
+        """Notificación no bloqueante en la barra de estado (reemplaza a messagebox)."""
+        estado_label.config(text=texto, fg=color)
+    
+    def cancelar_exportacion():
+        cancelar.set()
+        notificar("⏳ Cancelando al terminar el ciclo en curso...", '#B9770E')
+    
     def exportar_pdf_actual():
         ciclo = ciclos[idx_actual[0]]
-        file_path = exportar_a_pdf(horarios_dict[ciclo], max_colisiones_dict[ciclo], 
-                                   franjas_activas_dict[ciclo], ciclo)
-        messagebox.showinfo("✓ PDF Exportado", f"PDF generado:\n\n{file_path}")
+        lanzar_exportacion(
+            f"Exportando PDF del ciclo {ciclo}",
+            lambda progreso: exportar_a_pdf(horarios_dict[ciclo], max_colisiones_dict[ciclo],
+                                            franjas_activas_dict[ciclo], ciclo),
+            lambda file_path: f"✓ PDF generado: {file_path}", cancelable=False)
     
     def exportar_pdf_todos():
-        file_path = exportar_todos_pdf(horarios_dict, max_colisiones_dict, franjas_activas_dict)
-        messagebox.showinfo("✓ PDFs Exportados", f"PDF completo generado:\n\n{file_path}")
+        lanzar_exportacion(
+            "Exportando PDF completo",
+            lambda progreso: exportar_todos_pdf(horarios_dict, max_colisiones_dict,
+                                                franjas_activas_dict, progreso=progreso),
+            lambda file_path: f"✓ PDF completo generado: {file_path}")
     
     def exportar_excel_actual():
         ciclo = ciclos[idx_actual[0]]
-        file_path = exportar_horario_excel(horarios_dict[ciclo], max_colisiones_dict[ciclo],
-                                          franjas_activas_dict[ciclo], ciclo)
-        messagebox.showinfo("✓ Excel Exportado", f"Excel generado:\n\n{file_path}")
+        lanzar_exportacion(
+            f"Exportando Excel del ciclo {ciclo}",
+            lambda progreso: exportar_horario_excel(horarios_dict[ciclo],
+                                                    max_colisiones_dict[ciclo],
+                                                    franjas_activas_dict[ciclo], ciclo),
+            lambda file_path: f"✓ Excel generado: {file_path}", cancelable=False)
     
     def exportar_excel_todos():
-        archivos = exportar_todos_excel(horarios_dict, max_colisiones_dict, franjas_activas_dict)
-        mensaje = f"Se generaron {len(archivos)} archivos Excel:\n\n"
-        mensaje += "\n".join([f"• {Path(f).name}" for f in archivos[:3]])
-        if len(archivos) > 3:
-            mensaje += f"\n... y {len(archivos)-3} más"
-        messagebox.showinfo("✓ Excels Exportados", mensaje)
+        def mensaje(archivos):
+            texto = f"✓ Se generaron {len(archivos)} archivos Excel: "
+            texto += ", ".join(Path(f).name for f in archivos[:3])
+            if len(archivos) > 3:
+                texto += f" ... y {len(archivos)-3} más"
+            return texto
+        
+        lanzar_exportacion(
+            "Exportando todos los Excel",
+            lambda progreso: exportar_todos_excel(horarios_dict, max_colisiones_dict,
+                                                  franjas_activas_dict, progreso=progreso),
+            mensaje)
     
     def cerrar_ventana():
+        cancelar.set()
+        ejecutor.shutdown(wait=False, cancel_futures=True)
+        precargador.shutdown(wait=False, cancel_futures=True)
         root.destroy()
     
     root.protocol("WM_DELETE_WINDOW", cerrar_ventana)
@@ -265,5 +510,22 @@ def mostrar_horarios_navegables(horarios_dict, max_colisiones_dict, franjas_acti
     )
     btn_cerrar.pack(side=tk.LEFT, padx=5)
     
+    tk.Frame(btn_container, bg='#CCCCCC', width=2, height=40).pack(side=tk.LEFT, padx=10)
+    
+    # Progreso de la exportación en segundo plano
+    barra_progreso = ttk.Progressbar(btn_container, orient='horizontal', length=160)
+    barra_progreso.pack(side=tk.LEFT, padx=5)
+    
+    btn_cancelar = tk.Button(
+        btn_container, text="⏹ Cancelar", command=cancelar_exportacion,
+        font=("Arial", 9, "bold"), bg='#7F8C8D', fg='white',
+        width=10, height=2, cursor='hand2', state=tk.DISABLED
+    )
+    btn_cancelar.pack(side=tk.LEFT, padx=5)
+    
+    # Barra de estado: notificaciones de las exportaciones
+    estado_label = tk.Label(root, text="", font=("Arial", 9), bg='#F0F0F0', anchor='w', padx=10)
+    estado_label.pack(fill=tk.X, side=tk.BOTTOM)
+    
     dibujar_horario()
     root.mainloop()
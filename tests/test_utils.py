@@ -0,0 +1,47 @@
+import pickle
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from utils import GrillaFranjas, franjas_contiguas, hora_a_minutos
+
+
+def _rango(franjas, inicio, fin):
+    return franjas.rango(hora_a_minutos(inicio), hora_a_minutos(fin))
+
+
+def test_receso_corta_la_franja_que_lo_alcanza():
+    franjas = GrillaFranjas("08:00", "16:00", 45, recesos=[("13:00", "13:45")])
+    assert list(franjas[5:8]) == ["11:45 - 12:30", "12:30 - 13:00", "13:45 - 14:30"]
+
+
+def test_clase_que_termina_justo_en_el_receso():
+    franjas = GrillaFranjas("08:00", "16:00", 45, recesos=[("13:00", "13:45")])
+    primera, ultima = _rango(franjas, "11:45", "13:00")
+    assert list(franjas[primera:ultima]) == ["11:45 - 12:30", "12:30 - 13:00"]
+    primera, ultima = _rango(franjas, "12:30", "13:00")
+    assert list(franjas[primera:ultima]) == ["12:30 - 13:00"]
+
+
+def test_clase_dentro_del_receso_no_ocupa_franjas():
+    franjas = GrillaFranjas("08:00", "16:00", 45, recesos=[("13:00", "13:45")])
+    primera, ultima = _rango(franjas, "13:00", "13:45")
+    assert primera == ultima
+
+
+def test_receso_alineado_con_las_franjas():
+    franjas = GrillaFranjas("08:00", "16:00", 45, recesos=[("12:30", "13:15")])
+    assert list(franjas[5:7]) == ["11:45 - 12:30", "13:15 - 14:00"]
+
+
+def test_franjas_contiguas_separa_el_receso():
+    franjas = GrillaFranjas("11:45", "14:30", 45, recesos=[("13:00", "13:45")])
+    assert franjas_contiguas(franjas) == [True, False]
+
+
+def test_pickle_recalcula_las_tablas():
+    franjas = GrillaFranjas("07:00", "21:00", 15, recesos=[("13:00", "14:00")])
+    copia = pickle.loads(pickle.dumps(franjas))
+    assert list(copia) == list(franjas)
+    assert _rango(copia, "12:50", "14:20") == _rango(franjas, "12:50", "14:20")